@@ -0,0 +1,289 @@
+"""
+Offline backtest - geçmiş fikstür ve sonuç arşivini production'daki
+tahmin modelinden (prediction_model) aynen geçirir (ağ erişimi yok).
+
+Kullanım:
+    python backtest.py arsiv.json [--engine scalar|batch|poisson] [--json sonuc.json]
+
+Arşiv formatı:
+    {
+      "days": [
+        {
+          "date": "2025-03-01",
+          "fixtures": [ ...football-data maç objeleri (competition.code + skor)... ],
+          "histories": { "<team_id>": [ ...o tarihten önce bitmiş maçlar... ] },
+          "team_stats": { "<team_id>": { ...get_team_stats çıktısı... } },  # opsiyonel
+          "standings": { "<lig_kodu>": { ...o günkü /standings cevabı... } }  # opsiyonel
+        }
+      ]
+    }
+
+histories verilirse takım istatistikleri production'daki compute_team_stats
+ile (tarihten önceki son 10 maç) hesaplanır; team_stats verilirse doğrudan kullanılır.
+standings verilirse takım gücü production'daki güç tablosuyla (StrengthTable)
+aynı şekilde kurulur; verilmezse güç takım formundan hesaplanır.
+
+Takım istatistikleri sadece arşivden okunur: production'daki maç deposu ve form
+pencereleri (o günden sonraki sonuçları da içerir) kullanılmaz. Arşivde iki
+takımından biri için verisi olmayan maçlar atlanır ve raporda sayılır.
+
+main import edilmez: veritabanı, zamanlayıcı ve cache dizini açılmaz.
+Model ayarları production ile aynı ortam değişkenlerinden okunur.
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+
+import prediction_model
+from strength_table import StrengthTable
+from team_stats import TeamStats
+
+# main.py CONFIG ile aynı ayarlar
+MARKET_ENGINE = os.getenv("MARKET_ENGINE", "scalar")
+COUPON_MODE = os.getenv("COUPON_MODE", "optimize")
+COUPON_MIN_LEG_PROB = float(os.getenv("COUPON_MIN_LEG_PROB", "65"))
+TEAM_FORM_WINDOW = int(os.getenv("TEAM_FORM_WINDOW", "10"))
+STRENGTH_MIN_GAMES = int(os.getenv("STRENGTH_MIN_GAMES", "3"))
+
+MARKET_CHECKS = {
+    "MS1": lambda h, a, ht: h > a,
+    "MS0": lambda h, a, ht: h == a,
+    "MS2": lambda h, a, ht: h < a,
+    "O25": lambda h, a, ht: h + a >= 3,
+    "KG": lambda h, a, ht: h > 0 and a > 0,
+    "FH15": lambda h, a, ht: ht is not None and ht >= 2,
+}
+
+TIERS = ("daily", "high_odds", "super_odds")
+
+
+class ArchiveDay:
+    """Bir arşiv gününün takım istatistikleri ve güç tablosu (sadece o günden önceki veri)"""
+
+    def __init__(self, day):
+        self.stats = {}
+        self.strength_table = StrengthTable(min_games=STRENGTH_MIN_GAMES)
+
+        for code, standings in (day.get("standings") or {}).items():
+            self.strength_table.load_standings(code, standings)
+
+        for tid, stats in (day.get("team_stats") or {}).items():
+            self.stats[int(tid)] = TeamStats.from_mapping(stats)
+
+        cutoff = day["date"]
+        for tid, history in (day.get("histories") or {}).items():
+            tid = int(tid)
+            if tid in self.stats:
+                continue
+            finished = sorted(
+                (m for m in history if m.get("utcDate", "")[:10] < cutoff),
+                key=lambda m: m["utcDate"], reverse=True
+            )[:TEAM_FORM_WINDOW]
+            self.stats[tid] = prediction_model.compute_team_stats(tid, finished, TEAM_FORM_WINDOW)
+
+    def has_data(self, match):
+        return all(match[side]["id"] in self.stats for side in ("homeTeam", "awayTeam"))
+
+    def model_inputs(self, match, league_code):
+        """main.build_markets ile aynı girdiler: (hs, as_, ev_gücü, dep_gücü, lig_kodu)"""
+        home_id = match["homeTeam"]["id"]
+        away_id = match["awayTeam"]["id"]
+        hs, as_ = self.stats[home_id], self.stats[away_id]
+        return (
+            hs, as_,
+            prediction_model.team_strength(self.strength_table, home_id, hs),
+            prediction_model.team_strength(self.strength_table, away_id, as_),
+            league_code,
+        )
+
+
+def market_hit(match, market):
+    """Maç sonucuna göre market tuttu mu? Skor yoksa None"""
+    ft = match["score"]["fullTime"]
+    if ft["home"] is None:
+        return None
+    ht = match["score"].get("halfTime") or {}
+    ht_total = ht["home"] + ht["away"] if ht.get("home") is not None else None
+    return MARKET_CHECKS[market](ft["home"], ft["away"], ht_total)
+
+
+def replay_day(day, engine):
+    """
+    Bir günü production sırasıyla puanla.
+    (puanlanan maçlar, picks, kuponlar, süre, {"no_data": n, "errors": n}) döner.
+    """
+    archive_day = ArchiveDay(day)
+
+    by_code = defaultdict(list)
+    for m in day["fixtures"]:
+        by_code[m["competition"]["code"]].append(m)
+
+    candidates = [
+        (m, code) for code in prediction_model.COMPETITIONS.values()
+        for m in by_code.get(code, [])
+    ]
+    entries = [(m, code) for m, code in candidates if archive_day.has_data(m)]
+    skipped = {"no_data": len(candidates) - len(entries), "errors": 0}
+
+    picks = []
+    scored = []
+    started = time.perf_counter()
+
+    batch_markets = {}
+    if engine == "batch":
+        try:
+            markets, model_probs = prediction_model.score_batch(
+                [archive_day.model_inputs(m, code) for m, code in entries]
+            )
+            for (m, _), mk, probs in zip(entries, markets, model_probs):
+                batch_markets[id(m)] = (mk, probs)
+        except Exception as e:
+            print(f"⚠️ Vektörize hesap başarısız, maç maç hesaplanacak: {e}")
+            batch_markets = {}
+
+    # build_day_snapshot gibi: tek maçtaki hata günü durdurmaz
+    for m, code in entries:
+        try:
+            if id(m) in batch_markets:
+                m["markets"], m["model_probs"] = batch_markets[id(m)]
+            else:
+                m["markets"], m["model_probs"] = prediction_model.score_match(
+                    *archive_day.model_inputs(m, code),
+                    engine="scalar" if engine == "batch" else engine
+                )
+            pick = prediction_model.pick_from_markets(m, m["markets"])
+            if pick:
+                picks.append(pick)
+            scored.append((m, code))
+        except Exception as e:
+            print(f"      ❌ {day['date']} maç işlenirken hata ({m.get('id')}): {e}")
+            skipped["errors"] += 1
+
+    coupons = prediction_model.generate_coupons(
+        picks, [m for m, _ in scored], mode=COUPON_MODE, min_leg_prob=COUPON_MIN_LEG_PROB
+    )
+    elapsed = time.perf_counter() - started
+
+    return scored, picks, coupons, elapsed, skipped
+
+
+def _rate(bucket):
+    return round(bucket["hit"] / bucket["total"] * 100, 2) if bucket["total"] else None
+
+
+def run_backtest(archive, engine="scalar"):
+    per_market = defaultdict(lambda: {"hit": 0, "total": 0})
+    per_league = defaultdict(lambda: {"hit": 0, "total": 0})
+    best_all = {"hit": 0, "total": 0}
+    tiers = {t: {"hit": 0, "total": 0, "legs_hit": 0, "legs": 0} for t in TIERS}
+    n_matches = 0
+    skipped = {"no_data": 0, "errors": 0}
+    model_time = 0.0
+
+    for day in archive["days"]:
+        entries, picks, coupons, elapsed, day_skipped = replay_day(day, engine)
+        model_time += elapsed
+        n_matches += len(entries)
+        for reason, count in day_skipped.items():
+            skipped[reason] += count
+
+        by_name = {}
+        for m, code in entries:
+            by_name[f"{m['homeTeam']['name']} - {m['awayTeam']['name']}"] = (m, code)
+
+            hit = market_hit(m, m["markets"]["best"])
+            if hit is not None:
+                best_all["total"] += 1
+                best_all["hit"] += int(hit)
+
+        for p in picks:
+            m, code = by_name[p["match"]]
+            hit = market_hit(m, p["market"])
+            if hit is None:
+                continue
+            for bucket in (per_market[p["market"]], per_league[code]):
+                bucket["total"] += 1
+                bucket["hit"] += int(hit)
+
+        for tier in TIERS:
+            legs = coupons.get(tier) or []
+            results = [market_hit(by_name[p["match"]][0], p["market"]) for p in legs]
+            if not legs or any(r is None for r in results):
+                continue
+            tiers[tier]["total"] += 1
+            tiers[tier]["hit"] += int(all(results))
+            tiers[tier]["legs"] += len(results)
+            tiers[tier]["legs_hit"] += sum(results)
+
+    picks_total = sum(b["total"] for b in per_market.values())
+    picks_hit = sum(b["hit"] for b in per_market.values())
+
+    return {
+        "engine": engine,
+        "days": len(archive["days"]),
+        "matches": n_matches,
+        "skipped": skipped,
+        "picks": {"total": picks_total, "hit_rate": _rate({"hit": picks_hit, "total": picks_total})},
+        "best_market_all_matches": {"total": best_all["total"], "hit_rate": _rate(best_all)},
+        "per_market": {k: {"total": v["total"], "hit_rate": _rate(v)} for k, v in sorted(per_market.items())},
+        "per_league": {k: {"total": v["total"], "hit_rate": _rate(v)} for k, v in sorted(per_league.items())},
+        "coupons": {
+            t: {
+                "total": v["total"],
+                "win_rate": _rate(v),
+                "leg_hit_rate": _rate({"hit": v["legs_hit"], "total": v["legs"]}),
+            }
+            for t, v in tiers.items()
+        },
+        "model_seconds": round(model_time, 4),
+        "matches_per_second": round(n_matches / model_time, 1) if model_time else None,
+    }
+
+
+def print_report(report):
+    print(f"\n{'='*60}")
+    print(f"📈 BACKTEST - motor: {report['engine']}")
+    print(f"{'='*60}")
+    print(f"   📅 {report['days']} gün, {report['matches']} maç")
+    if any(report["skipped"].values()):
+        print(f"   ⏭️ Atlanan: {report['skipped']['no_data']} maç arşivde takım verisi yok, "
+              f"{report['skipped']['errors']} maç hatalı")
+    print(f"   ⭐ Tahmin (%65+): {report['picks']['total']} → isabet %{report['picks']['hit_rate']}")
+    print(f"   🎯 Hedef: %83.5")
+    print(f"   📊 Tüm maçlarda en iyi market: %{report['best_market_all_matches']['hit_rate']}")
+
+    print(f"\n   Market bazında:")
+    for k, v in report["per_market"].items():
+        print(f"      {k:<5} {v['total']:>5} tahmin  %{v['hit_rate']}")
+
+    print(f"\n   Lig bazında:")
+    for k, v in report["per_league"].items():
+        print(f"      {k:<5} {v['total']:>5} tahmin  %{v['hit_rate']}")
+
+    print(f"\n   Kuponlar:")
+    for k, v in report["coupons"].items():
+        print(f"      {k:<11} {v['total']:>4} kupon  kazanma %{v['win_rate']}  ayak %{v['leg_hit_rate']}")
+
+    print(f"\n   ⚡ Model süresi: {report['model_seconds']} sn → {report['matches_per_second']} maç/sn")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline tahmin modeli backtest'i")
+    parser.add_argument("archive", help="Geçmiş fikstür/sonuç arşivi (JSON)")
+    parser.add_argument("--engine", default=MARKET_ENGINE, choices=["scalar", "batch", "poisson"])
+    parser.add_argument("--json", dest="json_out", help="Raporu JSON olarak kaydet")
+    args = parser.parse_args()
+
+    with open(args.archive, "r", encoding="utf-8") as f:
+        archive = json.load(f)
+
+    report = run_backtest(archive, engine=args.engine)
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Rapor kaydedildi: {args.json_out}")
@@ -0,0 +1,144 @@
+"""
+Vektörize market motoru - günün (veya backtest'in) tüm maçlarını tek geçişte
+NumPy dizileriyle hesaplar.
+
+prediction_model.py'deki skaler ms_probs / over_probs / kg_probs / fh_probs +
+score_match akışının birebir karşılığıdır: aynı işlem sırası, aynı
+yuvarlama (Python round) ve aynı 95 tavanı kullanılır, böylece sonuçlar
+bit düzeyinde aynı çıkar.
+"""
+import numpy as np
+
+MARKETS = ("MS1", "MS0", "MS2", "O25", "KG", "FH15")
+
+# Her maç için beklenen özellik dizileri (uzunluk n)
+FEATURES = (
+    "home_scored", "away_scored",            # ev/deplasman (veya genel) gol ort.
+    "home_avg_scored", "away_avg_scored",    # genel gol ort. (oyun tarzı)
+    "home_avg_conceded", "away_avg_conceded",
+    "home_over25", "away_over25",
+    "home_kg", "away_kg",
+    "home_fh15", "away_fh15",
+    "home_strength", "away_strength",
+    "home_consistency", "away_consistency",
+    "weight",                                # LEAGUE_WEIGHT
+)
+
+
+def _round2(values):
+    """
+    Python round(x, 2) ile birebir aynı sonuç.
+    np.round sadece .5 sınırına çok yakın değerlerde farklı olabilir;
+    o elemanlar Python round ile yeniden hesaplanır.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded.flat[i] = round(float(values.flat[i]), 2)
+    return rounded
+
+
+def score_batch(features):
+    """
+    features: FEATURES anahtarlı dict (her biri n uzunluklu dizi)
+
+    Dönüş:
+        raw         (n, 6) lig ağırlığı uygulanmamış model yüzdeleri (edge hesabı için)
+        values      (n, 6) ağırlıklı ve yuvarlanmış market yüzdeleri (MARKETS sırası)
+        capped      (n, 6) 95 tavanına takılan hücreler (skaler yolda int 95)
+        best_idx    (n,)   en yüksek marketin indeksi
+        best_value  (n,)
+        is_pick     (n,)   best_value >= 65
+    """
+    f = {k: np.asarray(features[k], dtype=np.float64) for k in FEATURES}
+
+    # ---- MS (ms_probs) ----
+    diff = f["home_scored"] - f["away_scored"]
+
+    away_strength = f["away_strength"]
+    diff = diff * np.where(
+        away_strength > 75, 0.3,
+        np.where(away_strength > 65, 0.5,
+                 np.where(away_strength > 55, 0.7, 1.0))
+    )
+    diff = diff * np.where(f["home_strength"] < 40, 0.8, 1.0)
+
+    diff = diff * f["home_consistency"]
+    diff = diff * (2 - f["away_consistency"])
+
+    ms1 = np.maximum(18, 50 + diff * 11)
+    ms2 = np.maximum(18, 50 - diff * 11)
+    msx = np.maximum(12, 100 - (ms1 + ms2))
+    t = ms1 + msx + ms2
+
+    MS1 = _round2(ms1 / t * 100)
+    MS0 = _round2(msx / t * 100)
+    MS2 = _round2(ms2 / t * 100)
+
+    ha, aa = f["home_avg_scored"], f["away_avg_scored"]
+    hd, ad = f["home_avg_conceded"], f["away_avg_conceded"]
+
+    # ---- O2.5 (over_probs) ----
+    base = (f["home_over25"] + f["away_over25"]) / 2
+    base = base * np.where(
+        (ha > 2.5) & (aa > 2.5), 1.15,
+        np.where((ha < 1.2) & (aa < 1.2), 0.80, 1.0)
+    )
+    base = base * np.where(((ha > 2.5) & (ad > 1.8)) | ((aa > 2.5) & (hd > 1.8)), 1.10, 1.0)
+    O25 = _round2(base)
+    O25 = np.where(O25 > 95, 95.0, O25)
+
+    # ---- KG (kg_probs) ----
+    base = (f["home_kg"] + f["away_kg"]) / 2
+    base = base * np.where((ha > 2.0) & (aa > 2.0), 1.12, 1.0)
+    base = base * np.where((ha < 1.0) | (aa < 1.0), 0.85, 1.0)
+    KG = _round2(base)
+    KG = np.where(KG > 90, 90.0, KG)
+
+    # ---- FH1.5 (fh_probs) ----
+    FH15 = _round2((f["home_fh15"] + f["away_fh15"]) / 2)
+
+    # ---- Liga ağırlığı + 95 tavanı (build_markets) ----
+    raw = np.stack([MS1, MS0, MS2, O25, KG, FH15], axis=1)
+    weighted = raw * f["weight"][:, None]
+
+    # Skaler yolda min(v * w, 95) sadece v * w > 95 ise int 95 döner
+    capped = weighted > 95
+    values = np.where(capped, 95.0, _round2(np.minimum(weighted, 95)))
+
+    best_idx = np.argmax(values, axis=1)
+    best_value = values[np.arange(len(values)), best_idx]
+
+    return {
+        "raw": raw,
+        "values": values,
+        "capped": capped,
+        "best_idx": best_idx,
+        "best_value": best_value,
+        "is_pick": best_value >= 65,
+    }
+
+
+def to_model_probs(result):
+    """score_batch sonucundan maç başına ağırlıksız model yüzdeleri: [{market: %}]"""
+    return [
+        {key: float(row[j]) for j, key in enumerate(MARKETS)}
+        for row in result["raw"]
+    ]
+
+
+def to_market_dicts(result):
+    """score_batch sonucunu build_markets'in döndürdüğü dict listesine çevir"""
+    out = []
+    values, capped = result["values"], result["capped"]
+    for i in range(len(values)):
+        markets = {}
+        for j, key in enumerate(MARKETS):
+            markets[key] = 95 if capped[i, j] else float(values[i, j])
+        best_key = MARKETS[int(result["best_idx"][i])]
+        markets["best"] = best_key
+        markets["best_value"] = markets[best_key]
+        out.append(markets)
+    return out
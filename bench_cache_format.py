@@ -0,0 +1,129 @@
+"""
+Maç snapshot dosya formatları karşılaştırması: eski JSON (indent=2, doğrudan yazım)
+ile kompakt JSON ve binary (zlib + marshal) atomik yazım.
+
+Kullanım:
+    python bench_cache_format.py [--matches 100 1000]
+
+Ölçülenler: dosya boyutu, kaydetme ve okuma (parse dahil) süresi.
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from cache_manager import CacheManager
+
+MARKETS = ("MS1", "MS0", "MS2", "O25", "KG", "FH15")
+
+
+def _random_match(match_id, rng):
+    """API maç objesi + hesaplanmış alanlar (snapshot'taki şekil)"""
+    markets = {key: rng.randint(10, 90) for key in MARKETS}
+    best = max(MARKETS, key=markets.get)
+    return {
+        "area": {"id": 2072, "name": "England", "code": "ENG", "flag": "https://crests.football-data.org/770.svg"},
+        "competition": {"id": 2021, "name": "Premier League", "code": "PL", "type": "LEAGUE",
+                        "emblem": "https://crests.football-data.org/PL.png"},
+        "season": {"id": 2287, "startDate": "2025-08-15", "endDate": "2026-05-24", "currentMatchday": 9},
+        "id": match_id,
+        "utcDate": f"2026-01-{rng.randint(1, 28):02d}T{rng.choice([12, 15, 17, 19])}:00:00Z",
+        "status": "TIMED",
+        "matchday": 9,
+        "stage": "REGULAR_SEASON",
+        "lastUpdated": "2026-01-20T08:20:00Z",
+        "homeTeam": {"id": rng.randint(1, 5000), "name": f"Home Team {match_id}", "shortName": f"Home {match_id}",
+                     "tla": "HOM", "crest": f"https://crests.football-data.org/{match_id}.png"},
+        "awayTeam": {"id": rng.randint(1, 5000), "name": f"Away Team {match_id}", "shortName": f"Away {match_id}",
+                     "tla": "AWY", "crest": f"https://crests.football-data.org/{match_id + 1}.png"},
+        "score": {"winner": None, "duration": "REGULAR",
+                  "fullTime": {"home": None, "away": None}, "halfTime": {"home": None, "away": None}},
+        "odds": {"msg": "Activate Odds-Package in User-Panel to retrieve odds."},
+        "referees": [],
+        "time": "18:00",
+        "markets": {**markets, "best": best, "best_value": markets[best]},
+        "strength": {"home": rng.randint(20, 80), "away": rng.randint(20, 80)},
+    }
+
+
+def _random_snapshot(n_matches, seed=1):
+    rng = random.Random(seed)
+    leagues = [f"League {i}" for i in range(12)]
+    matches = {league: [] for league in leagues}
+    picks = []
+    for k in range(n_matches):
+        m = _random_match(100000 + k, rng)
+        matches[leagues[k % len(leagues)]].append(m)
+        if m["markets"]["best_value"] >= 65:
+            picks.append({"match": f"{m['homeTeam']['name']} - {m['awayTeam']['name']}",
+                          "market": m["markets"]["best"], "value": m["markets"]["best_value"]})
+    coupons = {"daily": picks[:3], "high_odds": picks[3:7], "super_odds": picks[7:12]}
+    return matches, picks, coupons
+
+
+def _timed(fn, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def run(n_matches):
+    matches, picks, coupons = _random_snapshot(n_matches)
+    day = "2099-01-01"  # cleanup_old silmesin
+    result = {"matches": n_matches, "file_kb": {}, "save_ms": {}, "load_ms": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file = Path(tmp) / "legacy.json"
+        data = {"date": day, "timestamp": "", "matches": matches, "picks": picks, "coupons": coupons}
+
+        def save_legacy():
+            with open(legacy_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+        def load_legacy():
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        _, result["save_ms"]["legacy"] = _timed(save_legacy)
+        _, result["load_ms"]["legacy"] = _timed(load_legacy)
+        result["file_kb"]["legacy"] = legacy_file.stat().st_size / 1024
+
+        for file_format in ("json", "bin"):
+            cm = CacheManager(Path(tmp) / file_format, file_format=file_format)
+            _, result["save_ms"][file_format] = _timed(
+                lambda: cm.save_matches_cache(matches, picks, coupons, for_date=day)
+            )
+            loaded, result["load_ms"][file_format] = _timed(lambda: cm.get_matches_cache(day, mutable=True))
+            assert loaded["matches"] == matches, f"{file_format} formatı veriyi birebir korumalı"
+            result["file_kb"][file_format] = len(cm.backend.get(cm._matches_key(day))) / 1024
+
+    for key in ("save_ms", "load_ms"):
+        result[key] = {k: round(v * 1000, 2) for k, v in result[key].items()}
+    result["file_kb"] = {k: round(v, 1) for k, v in result["file_kb"].items()}
+    return result
+
+
+def print_result(r):
+    print(f"\n📊 {r['matches']} maç")
+    for key, label in (("file_kb", "Dosya (KB)"), ("save_ms", "Kaydetme (ms)"), ("load_ms", "Okuma (ms)")):
+        legacy = r[key]["legacy"]
+        cells = "   ".join(
+            f"{fmt}: {value:>9} ({legacy / value:.1f}x)" if value else f"{fmt}: {value:>9}"
+            for fmt, value in r[key].items() if fmt != "legacy"
+        )
+        print(f"   {label:<14} eski: {legacy:>9}   {cells}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot dosya formatı benchmark'ı")
+    parser.add_argument("--matches", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    for n in args.matches:
+        print_result(run(n))
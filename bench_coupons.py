@@ -0,0 +1,111 @@
+"""
+Kupon seçimi karşılaştırması: eski sıralayıp dilimleme (0:3, 3:7, 7:12)
+ile coupon_optimizer (maç grupları üzerinde dinamik programlama, aralıkta
+kombinasyon yoksa aralıksız en iyi ayaklar).
+
+Kullanım:
+    python bench_coupons.py [--candidates 50 200 500] [--odds]
+
+--odds verilirse adayların bir kısmına adil orandan sapan "bahisçi oranı"
+eklenir (EV terimi devreye girer). Ölçülenler: süre, birleşik olasılık,
+toplam oran, beklenen değer, aynı maçtan ayak ve oran aralığı ihlalleri.
+"""
+import argparse
+import itertools
+import math
+import random
+import time
+
+from coupon_optimizer import DEFAULT_TIERS, coupon_summary, leg_odds, optimize_coupons
+
+TIERS = list(DEFAULT_TIERS)
+
+
+def make_candidates(n, with_odds=False, seed=1):
+    """n aday; maç başına 1-3 market (aynı maçtan birden fazla aday olabilir)"""
+    rng = random.Random(seed)
+    candidates = []
+    match_no = 0
+    while len(candidates) < n:
+        match_no += 1
+        for market in rng.sample(["MS1", "MS2", "O25", "KG", "FH15"], rng.randint(1, 3)):
+            value = round(rng.uniform(60, 95), 2)
+            leg = {"match": f"Ev{match_no} - Dep{match_no}", "market": market, "value": value}
+            if with_odds and rng.random() < 0.7:
+                leg["odds"] = max(1.01, round(100 / value * rng.uniform(0.85, 1.15), 2))
+            candidates.append(leg)
+    return candidates[:n]
+
+
+def slice_coupons(candidates):
+    """main.generate_coupons'ın eski dilimleme davranışı"""
+    ordered = sorted((c for c in candidates if c["value"] >= 65), key=lambda c: c["value"], reverse=True)
+    return {"daily": ordered[:3], "high_odds": ordered[3:7], "super_odds": ordered[7:12]}
+
+
+def brute_force_tier(groups, legs, min_odds, max_odds):
+    """
+    Referans: coupon_optimizer._best_in_range ile aynı girdi ([[(skor, dilim, ayak)]]),
+    tüm maç kombinasyonları ve maç başına tüm ayaklar denenir.
+    Oran aralığındaki en iyi (skor toplamı, ayaklar), yoksa None.
+    """
+    best = None
+    for combo in itertools.combinations(groups, legs):
+        for choice in itertools.product(*combo):
+            odds = math.prod(leg_odds(leg) for _, _, leg in choice)
+            if not min_odds <= odds <= max_odds:
+                continue
+            score = sum(s for s, _, _ in choice)
+            if best is None or score > best[0]:
+                best = (score, [leg for _, _, leg in choice])
+    return best
+
+
+def violations(coupons):
+    dup = in_range = 0
+    for tier in TIERS:
+        legs = coupons[tier]
+        dup += len(legs) - len({leg["match"] for leg in legs})
+        odds = coupon_summary(legs)["odds"]
+        if legs and not (DEFAULT_TIERS[tier]["min_odds"] <= odds <= DEFAULT_TIERS[tier]["max_odds"]):
+            in_range += 1
+    all_matches = [leg["match"] for tier in TIERS for leg in coupons[tier]]
+    return {"same_match": dup, "cross_tier_reuse": len(all_matches) - len(set(all_matches)), "odds_out_of_range": in_range}
+
+
+def run(n, with_odds, repeat=5):
+    candidates = make_candidates(n, with_odds)
+    out = {}
+    for label, fn in (("slice", slice_coupons), ("optimize", optimize_coupons)):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            coupons = fn(candidates)
+            best = min(best, time.perf_counter() - started)
+        out[label] = {
+            "ms": round(best * 1000, 2),
+            "tiers": {t: coupon_summary(coupons[t]) for t in TIERS},
+            "violations": violations(coupons),
+        }
+    return out
+
+
+def print_result(n, with_odds, result):
+    print(f"\n📊 {n} aday{' (oranlı)' if with_odds else ''}")
+    for label, r in result.items():
+        v = r["violations"]
+        print(f"   {label:<9} {r['ms']:>8} ms   aynı maç: {v['same_match']}  "
+              f"seviyeler arası tekrar: {v['cross_tier_reuse']}  oran aralığı dışı: {v['odds_out_of_range']}")
+        for tier, s in r["tiers"].items():
+            print(f"      {tier:<11} {s['legs']} ayak  olasılık %{s['probability'] * 100:6.2f}  "
+                  f"oran {s['odds']:6.2f}  EV {s['ev']:+.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kupon optimizasyonu benchmark'ı")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--odds", action="store_true", help="Adaylara bahisçi oranı ekle")
+    args = parser.parse_args()
+
+    for n in args.candidates:
+        print_result(n, args.odds, run(n, args.odds))
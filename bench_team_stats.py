@@ -0,0 +1,123 @@
+"""
+Takım istatistiği formatları karşılaştırması: eski dict + goals_list / JSON (indent=2)
+ile TeamStats (__slots__) / binary format.
+
+Kullanım:
+    python bench_team_stats.py [--teams 1000 10000]
+
+Ölçülenler: bellekteki boyut (tracemalloc), dosya boyutu, kaydetme ve okuma süresi.
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from team_form import RollingForm
+from team_stats import TeamStats, dumps_teams, loads_teams
+
+
+def _random_matches(team_id, rng, n=10):
+    matches = []
+    for k in range(n):
+        home = k % 2 == 0
+        fh, fa = rng.randint(0, 4), rng.randint(0, 3)
+        matches.append({
+            "id": team_id * 100 + k,
+            "utcDate": f"2025-01-{k + 1:02d}T15:00:00Z",
+            "homeTeam": {"id": team_id if home else -1},
+            "awayTeam": {"id": -1 if home else team_id},
+            "score": {
+                "fullTime": {"home": fh, "away": fa},
+                "halfTime": {"home": min(fh, 1), "away": min(fa, 1)},
+            },
+        })
+    return matches
+
+
+def _legacy_dict(team_id, matches):
+    """Eski get_team_stats çıktısı (goals_list dahil)"""
+    stats = RollingForm(team_id).extend(matches).to_stats().to_dict()
+    goals = []
+    for m in matches:
+        ft = m["score"]["fullTime"]
+        goals.append(ft["home"] if m["homeTeam"]["id"] == team_id else ft["away"])
+    for key in ("goals_n", "goals_mean", "goals_std"):
+        stats.pop(key)
+    stats["goals_list"] = goals
+    return stats
+
+
+def _measure(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    return obj, size
+
+
+def _timed(fn, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def run(n_teams, seed=1):
+    rng = random.Random(seed)
+    histories = {tid: _random_matches(tid, rng) for tid in range(1, n_teams + 1)}
+
+    legacy, legacy_mem = _measure(lambda: {tid: _legacy_dict(tid, ms) for tid, ms in histories.items()})
+    compact, compact_mem = _measure(lambda: {tid: RollingForm(tid).extend(ms).to_stats() for tid, ms in histories.items()})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = Path(tmp) / "teams.json"
+        bin_file = Path(tmp) / "teams.bin"
+
+        def save_json():
+            with open(json_file, "w", encoding="utf-8") as f:
+                json.dump({str(k): v for k, v in legacy.items()}, f, ensure_ascii=False, indent=2)
+
+        def load_json():
+            with open(json_file, "r", encoding="utf-8") as f:
+                return {int(k): v for k, v in json.load(f).items()}
+
+        _, json_save = _timed(save_json)
+        _, bin_save = _timed(lambda: bin_file.write_bytes(dumps_teams(compact)))
+        _, json_load = _timed(load_json)
+        loaded, bin_load = _timed(lambda: loads_teams(bin_file.read_bytes()))
+
+        assert loaded == compact, "binary format değerleri birebir korumalı"
+
+        return {
+            "teams": n_teams,
+            "memory_kb": {"dict": legacy_mem // 1024, "slots": compact_mem // 1024},
+            "file_kb": {"json": json_file.stat().st_size // 1024, "bin": bin_file.stat().st_size // 1024},
+            "save_ms": {"json": round(json_save * 1000, 2), "bin": round(bin_save * 1000, 2)},
+            "load_ms": {"json": round(json_load * 1000, 2), "bin": round(bin_load * 1000, 2)},
+        }
+
+
+def print_result(r):
+    print(f"\n📊 {r['teams']} takım")
+    for key, label in (("memory_kb", "Bellek (KB)"), ("file_kb", "Dosya (KB)"),
+                       ("save_ms", "Kaydetme (ms)"), ("load_ms", "Okuma (ms)")):
+        old, new = list(r[key].values())
+        ratio = f"{old / new:.1f}x" if new else "-"
+        print(f"   {label:<14} eski: {old:>10}   yeni: {new:>10}   ({ratio})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TeamStats format benchmark'ı")
+    parser.add_argument("--teams", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    for n in args.teams:
+        print_result(run(n))
@@ -0,0 +1,491 @@
+"""
+Snapshot ve takım cache'inin saklandığı arka uçlar.
+
+- FileBackend: cache_data/ dizini (varsayılan, tek makinede çoklu worker)
+- MemoryBackend: süreç içi (tek worker, geliştirme)
+- RedisBackend: Redis protokolü konuşan paylaşılan sunucu (çoklu instance);
+  bağımlılıksız küçük bir RESP istemcisi ile
+
+Anahtarlar dosya adı biçimindedir (matches_2026-01-21.json), böylece
+FileBackend'de disk düzeni değişmez. Her kayıt bir damga (stamp) taşır;
+CacheManager parse edilmiş snapshot'ı damga değişene kadar bellekte tutar.
+Build kilidi de arka uçtan alınır (lock), böylece snapshot'ı tüm worker /
+instance'lar arasında tek bir süreç hazırlar.
+"""
+import fnmatch
+import os
+import socket
+import ssl
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from single_flight import FileLock
+
+
+def atomic_write(file, data):
+    """Geçici dosyaya yaz + os.replace: okuyan hiçbir zaman yarım dosya görmez"""
+    tmp = file.with_name(f".{file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, file)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+class CacheBackend:
+    """
+    Arka uç arayüzü. Değerler bytes'tır.
+
+    stat(key) / get_with_stamp(key) → damga: kayıt değişince değişen,
+    karşılaştırılabilir bir değer; mtime: kaydın yazıldığı zaman (epoch sn).
+    """
+
+    name = "base"
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def get_with_stamp(self, key):
+        """(değer, damga, mtime) veya None; değer ve damga aynı kayda aittir"""
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def keys(self, pattern="*"):
+        """Glob desenine uyan anahtarlar"""
+        raise NotImplementedError
+
+    def stat(self, key):
+        """(damga, mtime) veya None"""
+        raise NotImplementedError
+
+    def lock(self, name):
+        """Süreçler arası kilit: acquire(blocking, timeout) / release()"""
+        raise NotImplementedError
+
+    def stats(self):
+        return {"backend": self.name}
+
+    def close(self):
+        """Açık bağlantıları kapat (kapanışta)"""
+
+
+# =====================
+# DOSYA
+# =====================
+class FileBackend(CacheBackend):
+    name = "file"
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / key
+
+    def get(self, key):
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def get_with_stamp(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                # Damga açılan dosyadan: okuma sırasında yeni dosya rename edilse bile tutarlı
+                st = os.fstat(f.fileno())
+                return f.read(), (st.st_mtime_ns, st.st_size), st.st_mtime
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        atomic_write(self._path(key), value)
+
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def keys(self, pattern="*"):
+        return [f.name for f in self.directory.glob(pattern) if f.is_file()]
+
+    def stat(self, key):
+        try:
+            st = self._path(key).stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size), st.st_mtime
+
+    def lock(self, name):
+        return FileLock(self.directory / f".{name}.lock")
+
+    def stats(self):
+        return {"backend": self.name, "directory": str(self.directory)}
+
+
+# =====================
+# BELLEK
+# =====================
+class LocalLock:
+    """FileLock ile aynı arayüzde süreç içi kilit"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking=True, timeout=None):
+        return self._lock.acquire(blocking, -1 if timeout is None or not blocking else timeout)
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class MemoryBackend(CacheBackend):
+    name = "memory"
+
+    def __init__(self):
+        self._data = {}  # key → (değer, sayaç, mtime)
+        self._counter = 0
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+        return item[0] if item else None
+
+    def get_with_stamp(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._counter += 1
+            self._data[key] = (bytes(value), self._counter, time.time())
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self, pattern="*"):
+        with self._lock:
+            return [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]
+
+    def stat(self, key):
+        with self._lock:
+            item = self._data.get(key)
+        return item[1:] if item else None
+
+    def lock(self, name):
+        with self._lock:
+            return self._locks.setdefault(name, LocalLock())
+
+    def stats(self):
+        with self._lock:
+            return {"backend": self.name, "keys": len(self._data)}
+
+
+# =====================
+# REDIS (RESP)
+# =====================
+class RedisError(Exception):
+    pass
+
+
+class RedisClient:
+    """
+    Minimal RESP2 istemcisi: komut gönder / cevap oku, küçük bağlantı havuzu.
+    Bağlantı koparsa komut yeni bağlantıyla bir kez tekrarlanır.
+    rediss:// adresleri TLS ile bağlanır (sistem CA'ları, sunucu adı doğrulanır).
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", timeout=5.0, pool_size=8, ssl_context=None):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", "rediss"):
+            raise ValueError(f"Desteklenmeyen Redis adresi: {url}")
+        self.tls = parsed.scheme == "rediss"
+        self.ssl_context = ssl_context
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        self._idle = []
+        self._lock = threading.Lock()
+
+    # ---------- bağlantı ----------
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.tls:
+            context = self.ssl_context or ssl.create_default_context()
+            try:
+                sock = context.wrap_socket(sock, server_hostname=self.host)
+            except Exception:
+                sock.close()
+                raise
+        conn = (sock, sock.makefile("rb"))
+        try:
+            if self.password:
+                auth = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+                self._roundtrip(conn, [auth])
+            if self.db:
+                self._roundtrip(conn, [("SELECT", self.db)])
+        except Exception:
+            self._close(conn)
+            raise
+        return conn
+
+    @staticmethod
+    def _close(conn):
+        for part in reversed(conn):
+            try:
+                part.close()
+            except OSError:
+                pass
+
+    # ---------- protokol ----------
+    @staticmethod
+    def _encode(command):
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if isinstance(arg, str):
+                arg = arg.encode("utf-8")
+            elif isinstance(arg, int):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Redis bağlantısı kapandı")
+        kind, body = line[:1], line[1:-2]
+
+        if kind == b"+":
+            return body  # basit string de bulk gibi bytes döner
+        if kind == b"-":
+            return RedisError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            size = int(body)
+            return None if size < 0 else [self._read(reader) for _ in range(size)]
+        raise RedisError(f"Beklenmeyen cevap: {line!r}")
+
+    def _roundtrip(self, conn, commands):
+        sock, reader = conn
+        sock.sendall(b"".join(self._encode(c) for c in commands))
+        replies = [self._read(reader) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    def pipeline(self, *commands):
+        """Komutları tek seferde gönder, cevap listesini döndür"""
+        for attempt in (1, 2):
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            try:
+                conn = conn or self._connect()
+                replies = self._roundtrip(conn, commands)
+            except (OSError, ConnectionError):
+                if conn:
+                    self._close(conn)
+                if attempt == 2:
+                    raise
+                continue
+            except RedisError:
+                self._release(conn)
+                raise
+
+            self._release(conn)
+            return replies
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        self._close(conn)
+
+    def execute(self, *command):
+        return self.pipeline(command)[0]
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+
+class RedisLock:
+    """
+    SET NX PX ile dağıtık kilit. Sahiplik rastgele token ile tutulur;
+    bırakırken sadece token eşleşirse silinir (süresi dolup başkasına geçmişse dokunulmaz).
+    """
+
+    RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, client, key, ttl=30 * 60):
+        self.client = client
+        self.key = key
+        self.ttl = ttl
+        self._token = None
+        self._local = threading.Lock()
+
+    def _try(self):
+        token = uuid.uuid4().hex
+        if self.client.execute("SET", self.key, token, "NX", "PX", int(self.ttl * 1000)) == b"OK":
+            self._token = token
+            return True
+        return False
+
+    def acquire(self, blocking=True, timeout=None):
+        if not self._local.acquire(blocking, -1 if timeout is None or not blocking else timeout):
+            return False
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while not self._try():
+                if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                    self._local.release()
+                    return False
+                time.sleep(0.2)
+        except Exception:
+            self._local.release()
+            raise
+        return True
+
+    def release(self):
+        try:
+            if self._token is not None:
+                self.client.execute("EVAL", self.RELEASE_SCRIPT, 1, self.key, self._token)
+        finally:
+            self._token = None
+            self._local.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class RedisBackend(CacheBackend):
+    """
+    Değer `<prefix><key>`, damga `<prefix>meta:<key>` anahtarında tutulur
+    (yazma zamanı ns + rastgele ek); ikisi MULTI/EXEC ile birlikte yazılır.
+    Snapshot tazeliği için her istekte sadece küçük damga okunur.
+    """
+
+    name = "redis"
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="ekinci:", lock_ttl=30 * 60):
+        self.client = RedisClient(url)
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+
+    def _key(self, key):
+        return self.prefix + key
+
+    def _meta(self, key):
+        return self.prefix + "meta:" + key
+
+    @staticmethod
+    def _parse_meta(meta):
+        if meta is None:
+            return None
+        meta = meta.decode()
+        return meta, int(meta.split(":")[0]) / 1e9
+
+    def get(self, key):
+        return self.client.execute("GET", self._key(key))
+
+    def get_with_stamp(self, key):
+        value, meta = self.client.execute("MGET", self._key(key), self._meta(key))
+        parsed = self._parse_meta(meta)
+        if value is None or parsed is None:
+            return None
+        return value, parsed[0], parsed[1]
+
+    def set(self, key, value):
+        meta = f"{time.time_ns()}:{uuid.uuid4().hex[:8]}"
+        self.client.pipeline(
+            ("MULTI",),
+            ("SET", self._key(key), value),
+            ("SET", self._meta(key), meta),
+            ("EXEC",),
+        )
+
+    def delete(self, key):
+        self.client.execute("DEL", self._key(key), self._meta(key))
+
+    def keys(self, pattern="*"):
+        found = []
+        cursor = b"0"
+        while True:
+            cursor, batch = self.client.execute("SCAN", cursor, "MATCH", self._key(pattern), "COUNT", 500)
+            for raw in batch:
+                key = raw.decode()[len(self.prefix):]
+                if not key.startswith(("meta:", "lock:")):
+                    found.append(key)
+            if cursor == b"0":
+                return found
+
+    def stat(self, key):
+        return self._parse_meta(self.client.execute("GET", self._meta(key)))
+
+    def lock(self, name):
+        return RedisLock(self.client, self.prefix + "lock:" + name, self.lock_ttl)
+
+    def close(self):
+        self.client.close()
+
+    def stats(self):
+        return {
+            "backend": self.name,
+            "server": f"{self.client.host}:{self.client.port}/{self.client.db}",
+            "tls": self.client.tls,
+            "prefix": self.prefix,
+        }
+
+
+def make_backend(kind, directory="cache_data", redis_url=None, prefix="ekinci:"):
+    """CACHE_BACKEND ayarından arka uç: file / memory / redis"""
+    if kind == "file":
+        return FileBackend(directory)
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "redis":
+        return RedisBackend(redis_url or "redis://localhost:6379/0", prefix)
+    raise ValueError(f"Geçersiz cache arka ucu: {kind}")
@@ -1,71 +1,376 @@
 import json
+import marshal
+import re
+import struct
+import threading
+import time
+import zlib
 from datetime import date, datetime
 from pathlib import Path
 
+from cache_backend import FileBackend
+from team_stats import TeamStats, dumps_teams, loads_teams
+
+
+# Binary snapshot: başlık (magic, format sürümü, marshal sürümü) + zlib(marshal)
+SNAPSHOT_MAGIC = b"MSNP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sHH")
+
+# Dosya formatı → uzantı
+FILE_FORMATS = {"json": ".json", "bin": ".bin"}
+
+# Arka uç hatası aynı sebeple her istekte loglanmasın (sn)
+BACKEND_ERROR_LOG_INTERVAL = 60
+
+
+def _plain(value):
+    """
+    marshal sadece temel tipleri yazar: defaultdict / numpy sayıları gibi alt
+    sınıfları JSON'un yazacağı karşılıklarına çevir (okuma JSON ile aynı şekli verir)
+    """
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, (str, bool)) or value is None:
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    if hasattr(value, "item"):
+        return value.item()  # numpy skaler
+    raise TypeError(f"Snapshot'a yazılamayan tip: {type(value).__name__}")
+
+
+def encode_snapshot(data, file_format="json"):
+    """Snapshot verisi → dosya içeriği (bytes)"""
+    if file_format == "bin":
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, marshal.version)
+        try:
+            payload = marshal.dumps(data)
+        except ValueError:
+            payload = marshal.dumps(_plain(data))
+        return header + zlib.compress(payload, 1)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_snapshot(raw):
+    """Dosya içeriği → snapshot verisi. Format magic ile ayırt edilir (eski indent=2 JSON dahil)."""
+    if raw[:4] != SNAPSHOT_MAGIC:
+        return json.loads(raw)
+    magic, version, marshal_version = SNAPSHOT_HEADER.unpack_from(raw)
+    if version != SNAPSHOT_VERSION or marshal_version != marshal.version:
+        raise ValueError(f"Bilinmeyen snapshot formatı: v{version} (marshal v{marshal_version})")
+    return marshal.loads(zlib.decompress(memoryview(raw)[SNAPSHOT_HEADER.size:]))
+
+
+class FrozenDict(dict):
+    """Değiştirilemeyen dict (json.dumps / tojson ile serileştirilebilir)"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("snapshot salt okunur; değiştirmek için get_matches_cache(mutable=True)")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+def freeze(value):
+    """JSON verisinin salt okunur görünümü: dict → FrozenDict, list → tuple"""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
 
 class CacheManager:
-    def __init__(self, cache_dir="cache_data"):
+    def __init__(self, cache_dir="cache_data", file_format="json", backend=None, tz=None):
+        """
+        file_format: snapshot yazım formatı, "json" (kompakt) veya "bin" (zlib + marshal)
+        backend: snapshot / takım cache'inin saklandığı yer (varsayılan: cache_dir dosyaları).
+        cache_dir her durumda yerel durum dosyaları (HTTP cache, maç deposu...) için kullanılır.
+        tz: "bugün"ün hesaplandığı saat dilimi (zamanlayıcı ile aynı olmalı), None → sunucu saati
+        """
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Geçersiz cache formatı: {file_format}")
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self.file_format = file_format
+        self.backend = backend or FileBackend(self.cache_dir)
+        self.tz = tz
+
+        # Süreç içi parse edilmiş snapshot'lar: anahtar → (damga, salt okunur görünüm)
+        # Damga (sürüm, arka uç damgası); kayıt değişmedikçe tekrar okunmaz
+        self._snapshots = {}
+        self._versions = {}
+        self._snapshot_lock = threading.Lock()
+
+        # Arka uç (ör. Redis) erişilemezse okumalar hata fırlatmaz:
+        # son okunan görünüm veya None döner, hata aralıklı loglanır
+        self.backend_errors = 0
+        self._error_logged_at = 0.0
+
+    def _backend_failed(self, action, error):
+        self.backend_errors += 1
+        now = time.monotonic()
+        if now - self._error_logged_at >= BACKEND_ERROR_LOG_INTERVAL:
+            self._error_logged_at = now
+            print(f"⚠️ Cache arka ucu hatası ({self.backend.name}, {action}): {error} "
+                  f"[toplam {self.backend_errors}]")
+
+    def _last_view(self, key):
+        """Arka uç okunamazken kullanılacak, süreçte en son okunan görünüm"""
+        with self._snapshot_lock:
+            entry = self._snapshots.get(key)
+        return entry[1] if entry else None
 
     def _today(self):
-        return date.today().isoformat()
+        if self.tz is None:
+            return date.today().isoformat()
+        return datetime.now(self.tz).date().isoformat()
 
-    def _matches_file(self):
-        return self.cache_dir / f"matches_{self._today()}.json"
+    def _matches_key(self, for_date=None, file_format=None):
+        ext = FILE_FORMATS[file_format or self.file_format]
+        return f"matches_{for_date or self._today()}{ext}"
+
+    def _existing_matches_key(self, for_date=None):
+        """Tercih edilen formattaki kayıt, yoksa diğer formatta yazılmış olan (format değişimi)"""
+        preferred = self._matches_key(for_date)
+        others = [
+            self._matches_key(for_date, file_format) for file_format in FILE_FORMATS
+            if self._matches_key(for_date, file_format) != preferred
+        ]
+        try:
+            if self.backend.stat(preferred) is not None:
+                return preferred
+            for key in others:
+                if self.backend.stat(key) is not None:
+                    return key
+        except Exception as e:
+            self._backend_failed("stat", e)
+            # Bellekte görünümü olan anahtar, yoksa tercih edilen
+            for key in (preferred, *others):
+                if self._last_view(key) is not None:
+                    return key
+        return preferred
 
-    def _teams_file(self):
-        return self.cache_dir / f"teams_{self._today()}.json"
+    def _teams_key(self):
+        return f"teams_{self._today()}.bin"
+
+    def _legacy_teams_key(self):
+        return f"teams_{self._today()}.json"
 
     # =====================
     # MATCH CACHE
     # =====================
-    def get_matches_cache(self):
-        file = self._matches_file()
-        if not file.exists():
+    def _stamp(self, key):
+        stat = self.backend.stat(key)
+        if stat is None:
             return None
+        return (self._versions.get(key, 0), stat[0])
+
+    def _load_snapshot(self, key):
+        """
+        ✅ Parse edilmiş snapshot'ı bellekten ver; sadece sürüm sayacı veya
+        arka uçtaki kaydın damgası değiştiyse (ör. başka worker yazdıysa) yeniden oku.
+        ✅ Arka uç erişilemezse son okunan görünüm döner (yoksa None).
+        """
         try:
-            with open(file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
+            stamp = self._stamp(key)
+        except Exception as e:
+            self._backend_failed("stat", e)
+            return self._last_view(key)
+        if stamp is None:
+            return None
+
+        with self._snapshot_lock:
+            entry = self._snapshots.get(key)
+            if entry and entry[0] == stamp:
+                return entry[1]
+
+        try:
+            found = self.backend.get_with_stamp(key)
+            if found is None:
+                return None
+            raw, backend_stamp, _ = found
+        except Exception as e:
+            self._backend_failed("get", e)
+            return self._last_view(key)
+        try:
+            view = freeze(decode_snapshot(raw))
+        except Exception as e:
+            print(f"⚠️ Snapshot okunamadı ({key}): {e}")
+            return None
+
+        # Sürüm okumadan önceki değer: arada kayıt olduysa sonraki istek yeniden okur
+        stamp = (stamp[0], backend_stamp)
+        with self._snapshot_lock:
+            self._snapshots[key] = (stamp, view)
+        return view
+
+    def get_matches_cache(self, for_date=None, mutable=False):
+        """
+        Günün (veya for_date'in, ISO) snapshot'ı.
+        Varsayılan salt okunur görünümdür (paylaşılır, değiştirilemez);
+        mutable=True arka uçtan yeni ve değiştirilebilir bir kopya okur.
+        """
+        key = self._existing_matches_key(for_date)
+        if not mutable:
+            return self._load_snapshot(key)
+        raw = self._safe_get(key)
+        try:
+            return decode_snapshot(raw) if raw is not None else None
+        except Exception as e:
+            print(f"⚠️ Snapshot okunamadı ({key}): {e}")
+            return None
+
+    def version_of(self, snapshot, local=False):
+        """
+        get_matches_cache'in verdiği görünümün kimliği, bilinmiyorsa None.
+        Varsayılan (anahtar, arka uç damgası): aynı kaydı okuyan tüm worker'larda
+        aynıdır (ETag). local=True süreç içi sürüm sayacını da ekler (bellek cache'leri).
+        """
+        with self._snapshot_lock:
+            for key, (stamp, view) in self._snapshots.items():
+                if view is snapshot:
+                    return (key, *stamp) if local else (key, stamp[1])
+        return None
+
+    def matches_cache_age(self, for_date=None):
+        """Bugünün (veya for_date'in) snapshot'ının yaşı (sn), kayıt yoksa / okunamazsa None"""
+        try:
+            stat = self.backend.stat(self._existing_matches_key(for_date))
+        except Exception as e:
+            self._backend_failed("stat", e)
+            return None
+        if stat is None:
             return None
+        return time.time() - stat[1]
+
+    def get_latest_matches_cache(self):
+        """Bugünün snapshot'ı yoksa en son kaydedilen (önceki gün) snapshot"""
+        today = self._today()
+        try:
+            keys = [k for ext in FILE_FORMATS.values() for k in self.backend.keys(f"matches_*{ext}")]
+        except Exception as e:
+            self._backend_failed("keys", e)
+            with self._snapshot_lock:
+                keys = list(self._snapshots)
+        keys.sort(key=self._key_date, reverse=True)
+        for key in keys:
+            if self._key_date(key) > today:
+                continue  # ileri tarihli (lookahead) snapshot
+            snapshot = self._load_snapshot(key)
+            if snapshot:
+                return snapshot
+        return None
 
-    def save_matches_cache(self, matches, picks, coupons=None):
-        """✅ Güncellenmiş - coupons parametresi eklendi"""
+    def save_matches_cache(self, matches, picks, coupons=None, for_date=None):
+        """✅ Güncellenmiş - coupons parametresi eklendi
+        ✅ for_date: ileri tarihli (lookahead) snapshot"""
         data = {
-            "date": self._today(),
+            "date": for_date or self._today(),
             "timestamp": datetime.now().strftime("%d.%m.%Y %H:%M"),
             "matches": matches,
             "picks": picks,
             "coupons": coupons or {"daily": [], "high_odds": [], "super_odds": []}
         }
-        with open(self._matches_file(), "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        key = self._matches_key(for_date)
+        self.backend.set(key, encode_snapshot(data, self.file_format))
+
+        # Format değiştiyse eski formattaki kayıt okuyucuları yanıltmasın
+        for file_format in FILE_FORMATS:
+            other = self._matches_key(for_date, file_format)
+            if other != key and self.backend.stat(other) is not None:
+                self.backend.delete(other)
+
+        # Aynı anda aynı damgayla yazılsa bile bellek kopyası geçersiz olsun
+        with self._snapshot_lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._snapshots.pop(key, None)
 
         self.cleanup_old()
 
+    # =====================
+    # V5 ÇIKTISI (oran + edge)
+    # =====================
+    def _v5_key(self, for_date=None):
+        return f"v5_{for_date or self._today()}.json"
+
+    def get_v5_output(self, for_date=None):
+        try:
+            raw = self.backend.get(self._v5_key(for_date))
+            return json.loads(raw) if raw is not None else None
+        except:
+            return None
+
+    def save_v5_output(self, data, for_date=None):
+        # v5 dış şema dosyası: okunabilir JSON kalır
+        self.backend.set(
+            self._v5_key(for_date),
+            json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        )
+
     # =====================
     # TEAM CACHE
     # =====================
-    def get_teams_cache(self):
-        file = self._teams_file()
-        if not file.exists():
+    def get_teams_cache(self, with_expiry=False):
+        """
+        {team_id: TeamStats}. Binary kayıt yoksa/bozuksa eski JSON formatı okunur.
+        with_expiry=True → {team_id: (TeamStats, bitiş epoch | None)}
+        Arka uç okunamazsa boş sözlük (takımlar depodan / API'den hesaplanır).
+        """
+        try:
+            raw = self.backend.get(self._teams_key())
+            legacy = None if raw is not None else self.backend.get(self._legacy_teams_key())
+        except Exception as e:
+            self._backend_failed("get", e)
+            return {}
+
+        if raw is not None:
+            try:
+                return loads_teams(raw, with_expiry)
+            except Exception as e:
+                print(f"⚠️ Takım cache dosyası okunamadı: {e}")
+                legacy = self._safe_get(self._legacy_teams_key())
+
+        if legacy is None:
             return {}
         try:
-            with open(file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            teams = {int(k): TeamStats.from_mapping(v) for k, v in json.loads(legacy).items()}
         except:
             return {}
+        return {tid: (stats, None) for tid, stats in teams.items()} if with_expiry else teams
 
-    def save_teams_cache(self, teams: dict):
-        with open(self._teams_file(), "w", encoding="utf-8") as f:
-            json.dump(teams, f, ensure_ascii=False, indent=2)
+    def _safe_get(self, key):
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            self._backend_failed("get", e)
+            return None
+
+    def save_teams_cache(self, teams: dict, expires=None):
+        """✅ Kompakt binary format (team_stats.dumps_teams), takım başına bitiş zamanıyla"""
+        self.backend.set(self._teams_key(), dumps_teams(teams, expires))
 
     # =====================
     # CLEANUP
     # =====================
+    @staticmethod
+    def _key_date(key):
+        found = re.search(r"\d{4}-\d{2}-\d{2}", key)
+        return found.group(0) if found else ""
+
     def cleanup_old(self):
+        """Geçmiş günlerin kayıtlarını sil (bugün ve ileri tarihliler kalır)"""
         today = self._today()
-        for f in self.cache_dir.glob("*.json"):
-            if today not in f.name:
-                f.unlink()
+        for pattern in ("*.json", "*.bin"):
+            for key in self.backend.keys(pattern):
+                key_date = self._key_date(key)
+                if key_date and key_date < today:
+                    self.backend.delete(key)
+                    with self._snapshot_lock:
+                        self._snapshots.pop(key, None)
+                        self._versions.pop(key, None)
@@ -0,0 +1,151 @@
+"""
+Beklenen değer (EV) bazlı kupon optimizasyonu.
+
+Her kupon seviyesi için aday ayaklardan en iyi kombinasyon, maç grupları
+üzerinde dinamik programlama ile seçilir:
+
+- seviye başına ayak sayısı
+- minimum ayak olasılığı
+- maç başına en fazla bir ayak (seviyeler arası da tekrar yok)
+- toplam oran hedef aralığı
+
+Amaç: log(Π p · Π oran) + TIE_BREAK · Σ log p
+p ayağın ağırlıksız model olasılığıdır ("prob"); "value" lig ağırlıklı ve
+95'te kesilmiş sıralama skorudur, sadece eşik ve gösterim için kullanılır.
+Gerçek oran yoksa adil oran (100 / prob) kullanılır; o durumda EV terimi
+sıfırlanır ve en yüksek birleşik olasılıklı kombinasyon seçilir.
+
+DP durumu (ayak sayısı, log toplam oran dilimi); log oran ODDS_RESOLUTION
+adımlarıyla aşağı yuvarlanır ve üst sınırdan ayak × ODDS_RESOLUTION pay
+düşülür, böylece seçilen kuponun gerçek oranı aralığın kesinlikle içindedir
+(sınıra ~%2'den yakın kombinasyonlar elenebilir, sonuç en iyiye çok yakındır).
+Maliyet O(aday × ayak × dilim), NumPy ile dilim boyutu tek işlemde güncellenir.
+"""
+import math
+
+import numpy as np
+
+# Kupon seviyeleri (sırayla doldurulur, birbirinden bağımsız maçlar)
+DEFAULT_TIERS = {
+    "daily": {"legs": 3, "min_odds": 1.0, "max_odds": 2.0},
+    "high_odds": {"legs": 4, "min_odds": 2.0, "max_odds": 5.0},
+    "super_odds": {"legs": 5, "min_odds": 4.0, "max_odds": 12.0},
+}
+MIN_LEG_PROB = 65        # yüzde
+TIE_BREAK = 0.01
+ODDS_RESOLUTION = 0.005  # log oran dilim genişliği
+
+
+def leg_prob(leg):
+    """Ayağın model olasılığı (0-1); "prob" yoksa (eski snapshot) skor kullanılır"""
+    return (leg.get("prob") or leg["value"]) / 100
+
+
+def leg_odds(leg):
+    """Ayağın oranı: beslemeden gelen oran, yoksa adil oran"""
+    return leg.get("odds") or 1 / leg_prob(leg)
+
+
+def _leg_score(leg):
+    p = leg_prob(leg)
+    return math.log(p * leg_odds(leg)) + TIE_BREAK * math.log(p)
+
+
+def _candidate(leg):
+    """DP girdisi: (skor, log oran dilimi, ayak)"""
+    width = max(0, math.floor(math.log(leg_odds(leg)) / ODDS_RESOLUTION))
+    return _leg_score(leg), width, leg
+
+
+def _best_in_range(groups, legs, min_odds, max_odds):
+    """
+    groups: [[(skor, dilim, ayak), ...] maç başına]
+    Oran aralığında en iyi kombinasyonun ayakları, yoksa None.
+    """
+    top = math.floor(math.log(max_odds) / ODDS_RESOLUTION) - legs
+    bottom = max(0, math.ceil(math.log(min_odds) / ODDS_RESOLUTION))
+    if bottom > top:
+        return None
+
+    dp = np.full((legs + 1, top + 1), -np.inf)
+    dp[0, 0] = 0.0
+    back = np.full((len(groups), legs + 1, top + 1), -1, dtype=np.int32)
+
+    for g, group in enumerate(groups):
+        new = dp.copy()
+        for c, (score, width, _) in enumerate(group):
+            if width > top:
+                continue
+            for j in range(1, legs + 1):
+                shifted = dp[j - 1, :top + 1 - width] + score
+                target = new[j, width:]
+                better = shifted > target
+                if better.any():
+                    target[better] = shifted[better]
+                    back[g, j, width:][better] = c
+        dp = new
+
+    final = dp[legs, bottom:]
+    if not np.isfinite(final).any():
+        return None
+
+    # Geri izleme: hangi grupta hangi ayak seçildi
+    j, b = legs, bottom + int(np.argmax(final))
+    chosen = []
+    for g in range(len(groups) - 1, -1, -1):
+        if j == 0:
+            break
+        c = back[g, j, b]
+        if c >= 0:
+            _, width, leg = groups[g][c]
+            chosen.append(leg)
+            j, b = j - 1, b - width
+    return chosen
+
+
+def _best_unconstrained(groups, legs):
+    """Oran aralığı yok: her maçın en iyi ayağı, sonra en iyi `legs` tanesi"""
+    best = [max(group, key=lambda c: c[0]) for group in groups]
+    best.sort(key=lambda c: c[0], reverse=True)
+    return [leg for _, _, leg in best[:legs]]
+
+
+def optimize_coupons(candidates, tiers=None, min_leg_prob=MIN_LEG_PROB):
+    """
+    candidates: [{"match", "market", "value", (ops.) "prob", (ops.) "odds", ...}]
+    Dönüş: {seviye: [ayak]} (generate_coupons ile aynı şekil)
+
+    Hedef oran aralığında kombinasyon yoksa aralık yok sayılarak en iyi
+    kombinasyon seçilir; yeterli farklı maç yoksa kalanlar kullanılır.
+    """
+    tiers = tiers or DEFAULT_TIERS
+    pool = [c for c in candidates if c["value"] >= min_leg_prob]
+    taken = set()
+    coupons = {}
+
+    for name, tier in tiers.items():
+        by_match = {}
+        for c in pool:
+            if c["match"] in taken:
+                continue
+            by_match.setdefault(c["match"], []).append(_candidate(c))
+        groups = list(by_match.values())
+
+        legs = None
+        if len(groups) >= tier["legs"]:
+            legs = _best_in_range(groups, tier["legs"], tier["min_odds"], tier["max_odds"])
+        if legs is None:
+            legs = _best_unconstrained(groups, tier["legs"]) if groups else []
+
+        legs = sorted(legs, key=lambda c: c["value"], reverse=True)
+        taken.update(leg["match"] for leg in legs)
+        coupons[name] = legs
+
+    return coupons
+
+
+def coupon_summary(legs):
+    """Kuponun birleşik olasılığı (0-1), toplam oranı ve beklenen değeri"""
+    prob = math.prod(leg_prob(leg) for leg in legs) if legs else 0.0
+    odds = math.prod(leg_odds(leg) for leg in legs) if legs else 0.0
+    return {"legs": len(legs), "probability": prob, "odds": odds, "ev": prob * odds - 1 if legs else 0.0}
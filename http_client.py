@@ -0,0 +1,75 @@
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpClient:
+    """
+    Host bazlı, keep-alive bağlantı havuzlu HTTP istemcisi.
+
+    - Her host için tek bir requests.Session (TCP+TLS bağlantısı tekrar kullanılır)
+    - Host başına havuz boyutu ayarlanabilir (paralel worker sayısı kadar)
+    - close() uygulama kapanırken tüm bağlantıları temizler
+    """
+
+    def __init__(self, pool_sizes=None, default_pool_size=4):
+        self.pool_sizes = dict(pool_sizes or {})
+        self.default_pool_size = default_pool_size
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def set_pool_size(self, host, size):
+        """Host için havuz boyutunu ayarla (session oluşmadan önce çağrılmalı)"""
+        with self._lock:
+            self.pool_sizes[host] = max(1, int(size))
+
+    def _session(self, url):
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                size = self.pool_sizes.get(host, self.default_pool_size)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, pool_block=True)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+                print(f"🔗 HTTP havuzu açıldı: {host} (max {size} bağlantı)")
+        return session
+
+    def get(self, url, **kwargs):
+        return self._session(url).get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._session(url).post(url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.items())
+            self._sessions.clear()
+
+        for host, session in sessions:
+            try:
+                session.close()
+            except Exception as e:
+                print(f"⚠️ HTTP havuzu kapatılamadı ({host}): {e}")
+
+        if sessions:
+            print(f"🔌 {len(sessions)} HTTP havuzu kapatıldı")
+
+    def stats(self):
+        with self._lock:
+            return {
+                host: self.pool_sizes.get(host, self.default_pool_size)
+                for host in self._sessions
+            }
+
+
+# Uygulama genelinde paylaşılan istemci (main.py ve sender.py)
+http_client = HttpClient(pool_sizes={"api.resend.com": 2})
@@ -1,19 +1,37 @@
 
 from fastapi import FastAPI, Request, Form, Cookie, UploadFile, File
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from markupsafe import Markup
 
 import requests, time, os
 from datetime import datetime, timedelta, timezone, date
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from cache_manager import CacheManager
+from cache_backend import make_backend
+from render_cache import (
+    RenderCache, USER_MENU_SLOT, audience_of, etag_matches, make_etag, templates_fingerprint
+)
+from rate_limiter import RateLimiter
+from http_client import http_client
+from response_cache import ResponseCache
+from scheduler import PipelineScheduler
+from single_flight import SingleFlight
+from ttl_cache import TTLCache
+import poisson_engine
+from match_store import MatchStore
+from team_form import TeamFormStore
+from strength_table import StrengthTable
+import odds_manager
+import prediction_model
+from prediction_model import COMPETITIONS, pick_from_markets
 from user_manager import UserManager
 from payment_manager import PaymentManager
 from password_reset_manager import PasswordResetManager  # ✅ YENİ
 from sqlalchemy import text
 from db_manager import get_connection
-import statistics
 
 app = FastAPI()
 
@@ -33,47 +51,112 @@ API_KEY = os.getenv("FOOTBALL_API_KEY", "350b0fe840aa431d8e199a328ac5cd34")
 BASE_URL = "https://api.football-data.org/v4"
 HEADERS = {"X-Auth-Token": API_KEY}
 
+# API planının dakikalık istek limiti (free plan: 10)
+API_REQUESTS_PER_MINUTE = int(os.getenv("API_REQUESTS_PER_MINUTE", "10"))
+
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "34emr256.")
 
+# Paralel çekme - 1 verilirse eski sıralı akış kullanılır
+FETCH_WORKERS = max(1, int(os.getenv("FETCH_WORKERS", "4")))
+
+# Fikstür çekme modu: "bulk" → tek /matches çağrısı, "league" → lig başına çağrı
+FIXTURE_MODE = os.getenv("FIXTURE_MODE", "bulk")
+
+# Arka plan pipeline zamanlaması (TR saati) ve tekrar aralığı (dk, 0 = kapalı)
+DAILY_BUILD_AT = os.getenv("DAILY_BUILD_AT", "00:05")
+REFRESH_INTERVAL_MINUTES = int(os.getenv("REFRESH_INTERVAL_MINUTES", "180"))
+
+# Market motoru: "scalar" → maç maç build_markets, "batch" → vektörize tek geçiş,
+# "poisson" → skor matrisi modeli (tüm marketler tek matristen)
+MARKET_ENGINE = os.getenv("MARKET_ENGINE", "scalar")
+
+# Bahis oranları: yerel besleme dosyası (boşsa oran/edge aşaması atlanır)
+ODDS_FEED_FILE = os.getenv("ODDS_FEED_FILE", "")
+ODDS_KICKOFF_TOLERANCE_HOURS = float(os.getenv("ODDS_KICKOFF_TOLERANCE_HOURS", "3"))
+odds_provider = odds_manager.FileOddsProvider(ODDS_FEED_FILE) if ODDS_FEED_FILE else None
+
+# Kuponlar: "optimize" (EV + kısıtlar, coupon_optimizer) | "slice" (eski ilk 3/4/5)
+COUPON_MODE = os.getenv("COUPON_MODE", "optimize")
+COUPON_MIN_LEG_PROB = float(os.getenv("COUPON_MIN_LEG_PROB", "65"))
+
+# İleri tarihli snapshot'lar: sonraki N günün marketleri önceden hesaplanır,
+# gün uzaklığı × LOOKAHEAD_REFRESH_HOURS saatten eskiyse yenilenir
+LOOKAHEAD_DAYS = int(os.getenv("LOOKAHEAD_DAYS", "2"))
+LOOKAHEAD_REFRESH_HOURS = float(os.getenv("LOOKAHEAD_REFRESH_HOURS", "12"))
+
+# Gün içi yenilemelerde sadece değişen maçları yeniden hesapla
+INCREMENTAL_REFRESH = os.getenv("INCREMENTAL_REFRESH", "1") == "1"
+
+# Hiç snapshot yokken ilk isteğin devam eden build'i bekleyeceği süre (sn)
+COLD_WAIT_SECONDS = float(os.getenv("COLD_WAIT_SECONDS", "20"))
+
+# Maç snapshot dosya formatı: "json" (kompakt JSON) veya "bin" (zlib + marshal,
+# format sürümü başlıklı). Okuma her iki formatı da tanır.
+CACHE_FORMAT = os.getenv("CACHE_FORMAT", "json")
+
+# Yerel durum dizini: dosya arka ucu, HTTP cache, maç deposu (history.db), form pencereleri
+CACHE_DIR = os.getenv("CACHE_DIR", "cache_data")
+
+# Snapshot / takım cache'i ve build kilidinin arka ucu:
+# "file" (CACHE_DIR, tek makine), "memory" (tek süreç), "redis" (çoklu instance, REDIS_URL;
+# TLS için rediss://)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "ekinci:")
+
+# Zamanlayıcı ve snapshot günü aynı saat diliminde (TR): gece yarısından
+# hemen sonraki build yeni günün snapshot'ını yazar
+TR_TZ = timezone(timedelta(hours=3))
+
+def local_today():
+    """Bugünün tarihi (TR saatiyle), sunucunun yerel saat diliminden bağımsız"""
+    return datetime.now(TR_TZ).date()
+
+def local_kickoff(match):
+    """Maçın başlama zamanı TR saatiyle (snapshot günü ve m["time"] bundan)"""
+    return datetime.fromisoformat(match["utcDate"].replace("Z", "+00:00")).astimezone(TR_TZ)
+
 # Managers
-cache_manager = CacheManager()
+cache_backend = make_backend(CACHE_BACKEND, CACHE_DIR, REDIS_URL, CACHE_KEY_PREFIX)
+cache_manager = CacheManager(CACHE_DIR, file_format=CACHE_FORMAT, backend=cache_backend, tz=TR_TZ)
 user_manager = UserManager()
 payment_manager = PaymentManager()
 reset_manager = PasswordResetManager()
+rate_limiter = RateLimiter(API_REQUESTS_PER_MINUTE)
+response_cache = ResponseCache(cache_manager.cache_dir / "http")
 
-# Memory cache
-TEAM_CACHE = {}
-TEAM_STRENGTH_CACHE = {}
-TR_TZ = timezone(timedelta(hours=3))
+# Render edilmiş dashboard/kupon gövdeleri (snapshot sürümü + kitle başına)
+render_cache = RenderCache()
 
-# =====================
-# LIGLER
-# =====================
-COMPETITIONS = {
-    "Champions League": "CL",
-    "Premier League": "PL",
-    "La Liga": "PD",
-    "Serie A": "SA",
-    "Bundesliga": "BL1",
-    "Ligue 1": "FL1",
-    "Eredivisie": "DED",
-    "Primeira Liga": "PPL",
-    "Championship": "ELC",
-    "Brezilya Serie A": "BSA"
-}
-
-LEAGUE_WEIGHT = {
-    "CL": 1.08,
-    "PL": 1.05,
-    "BL1": 1.04,
-    "SA": 1.04,
-    "PD": 1.03,
-    "FL1": 1.02,
-    "ELC": 1.01,
-    "PPL": 1.00,
-    "DED": 0.98,
-    "BSA": 1.00 
-}
+# Snapshot'tan üretilen sayfalar: tarayıcı saklar ama her ziyarette ETag ile doğrular
+SNAPSHOT_CACHE_CONTROL = os.getenv("SNAPSHOT_CACHE_CONTROL", "private, no-cache")
+TEMPLATES_VERSION = templates_fingerprint("templates")
+
+# Football API havuzu paralel worker sayısı kadar bağlantı tutar
+http_client.set_pool_size("api.football-data.org", FETCH_WORKERS)
+
+# Yerel maç geçmişi - takımlar bu kadar günde bir API'den tazelenir
+# (depoya sadece takip edilen liglerin sonuçları eklenir, kupa maçları vb. için)
+STORE_RESYNC_DAYS = int(os.getenv("STORE_RESYNC_DAYS", "14"))
+match_store = MatchStore(cache_manager.cache_dir / "history.db")
+
+# Takım formu: son N maçlık kayan pencere, yeni sonuçlarla O(1) güncellenir
+TEAM_FORM_WINDOW = int(os.getenv("TEAM_FORM_WINDOW", "10"))
+team_forms = TeamFormStore(cache_manager.cache_dir / "state" / "team_form.json", TEAM_FORM_WINDOW)
+
+# Memory cache - boyut sınırlı (LRU) ve kayıt bazlı süreli
+TEAM_CACHE_MAX_SIZE = int(os.getenv("TEAM_CACHE_MAX_SIZE", "2000"))
+TEAM_CACHE_TTL_HOURS = float(os.getenv("TEAM_CACHE_TTL_HOURS", "24"))
+MATCH_DURATION = timedelta(hours=2, minutes=30)  # başlama + bu süre sonra form değişir
+
+TEAM_CACHE = TTLCache(TEAM_CACHE_MAX_SIZE, TEAM_CACHE_TTL_HOURS * 3600, name="team_stats")
+
+# Takım gücü: lig puan durumlarından günde bir kez kurulan tablo
+STRENGTH_MIN_GAMES = int(os.getenv("STRENGTH_MIN_GAMES", "3"))
+STRENGTH_HISTORY_DAYS = int(os.getenv("STRENGTH_HISTORY_DAYS", "365"))
+NEUTRAL_STRENGTH = 50
+strength_table = StrengthTable(min_games=STRENGTH_MIN_GAMES)
+STRENGTH_TABLE_FILE = cache_manager.cache_dir / "state" / "strength_table.json"
 
 def get_current_user(session_id: str = None):
     if not session_id:
@@ -83,19 +166,46 @@ def get_current_user(session_id: str = None):
 def safe_request(url, params=None, retries=2):
     """
     API request - hata loglama ve retry ile
+    ✅ Tüm istekler ortak rate limiter'dan geçer (429 almadan önce beklenir)
+    ✅ Taze disk cache kaydı varsa istek hiç atılmaz (rate limit harcanmaz),
+       bayat kayıt ETag / Last-Modified ile koşullu doğrulanır
     """
+    cached = response_cache.get(url, params)
+    if cached and response_cache.is_fresh(cached, url):
+        response_cache.hit()
+        return cached["body"]
+
+    if response_cache.ttl_for(url) > 0:
+        response_cache.miss()
+
+    request_headers = {**HEADERS, **response_cache.conditional_headers(cached)}
+
     for attempt in range(retries):
         try:
-            r = requests.get(url, headers=HEADERS, params=params, timeout=30)
+            waited = rate_limiter.acquire()
+            if waited >= 1:
+                print(f"   ⏳ Rate limit için {waited:.1f} sn beklendi: {url}")
+
+            r = http_client.get(url, headers=request_headers, params=params, timeout=30)
+            rate_limiter.update_from_headers(r.headers)
             
             if r.status_code == 200:
-                return r.json()
+                data = r.json()
+                response_cache.store(url, params, data, r.headers)
+                return data
+            
+            elif r.status_code == 304 and cached:
+                return response_cache.refresh(url, params, cached, r.headers)
             
             elif r.status_code == 429:
-                wait_time = 20 * (attempt + 1)
+                # Sunucunun verdiği reset süresi kadar tüm istekleri durdur
+                try:
+                    wait_time = float(r.headers.get("X-RequestCounter-Reset", 60))
+                except (TypeError, ValueError):
+                    wait_time = 60
                 print(f"⚠️ Rate limit (429): {url}")
-                print(f"   💤 {wait_time} saniye bekleniyor...")
-                time.sleep(wait_time)
+                print(f"   💤 {wait_time:.0f} saniye bekleniyor...")
+                rate_limiter.block_for(wait_time)
                 continue
             
             elif r.status_code == 403:
@@ -148,330 +258,422 @@ def get_team_stats(team_id):
     """
     ✅ 3. ÖZELLİK: EV/DEPLASMAN FORMU AYRIMI
     Son 10 maçı ev ve deplasman olarak ayırır
+    ✅ Takım yerel depoda varsa son 10 maç indeksli sorguyla okunur,
+    yoksa API'den bir kez çekilip depoya yazılır
+    ✅ İstatistikler takımın kayan form penceresinden okunur; pencere bir kez
+    kurulur, sonrasında sync_finished_results yeni sonuçları O(1) ekler
     """
-    if team_id in TEAM_CACHE:
-        return TEAM_CACHE[team_id]
+    cached = TEAM_CACHE.get(team_id)
+    if cached is not None:
+        return cached
 
-    data = safe_request(
-        f"{BASE_URL}/teams/{team_id}/matches",
-        {"limit": 10, "status": "FINISHED"}
-    ).get("matches", [])
+    synced = match_store.is_synced(team_id, STORE_RESYNC_DAYS)
+    form = team_forms.get(team_id) if synced else None
 
-    # Genel istatistikler
-    g_for = g_against = over25 = kg = fh15 = home_count = 0
-    
-    # Ev/Deplasman ayrımı
-    home_goals = []
-    away_goals = []
-    home_conceded = []
-    away_conceded = []
-
-    for m in data:
-        ft = m["score"]["fullTime"]
-        ht = m["score"]["halfTime"]
-        if ft["home"] is None:
-            continue
-
-        is_home = m["homeTeam"]["id"] == team_id
-        tg = ft["home"] if is_home else ft["away"]
-        og = ft["away"] if is_home else ft["home"]
+    if form is None:
+        if synced:
+            data = match_store.team_matches(team_id, limit=TEAM_FORM_WINDOW)
+        else:
+            data = safe_request(
+                f"{BASE_URL}/teams/{team_id}/matches",
+                {"limit": TEAM_FORM_WINDOW, "status": "FINISHED"}
+            ).get("matches", [])
 
-        g_for += tg
-        g_against += og
+            if data:
+                match_store.upsert_matches(data)
+                match_store.mark_synced(team_id)
 
-        # ✅ Ev/Deplasman ayrımı
-        if is_home:
-            home_goals.append(tg)
-            home_conceded.append(og)
-            home_count += 1
-        else:
-            away_goals.append(tg)
-            away_conceded.append(og)
-
-        if tg + og >= 3:
-            over25 += 1
-        if tg > 0 and og > 0:
-            kg += 1
-        if ht and ht["home"] is not None and (ht["home"] + ht["away"]) >= 2:
-            fh15 += 1
-
-    total = len(data) or 1
-
-    stats = {
-        "avg_scored": g_for / total,
-        "avg_conceded": g_against / total,
-        "over25": over25 / total * 100,
-        "kg": kg / total * 100,
-        "fh15": fh15 / total * 100,
-        "home_rate": home_count / total * 100,
-        
-        # ✅ Ev/Deplasman ayrımı
-        "home_avg_scored": sum(home_goals) / max(len(home_goals), 1),
-        "home_avg_conceded": sum(home_conceded) / max(len(home_conceded), 1),
-        "away_avg_scored": sum(away_goals) / max(len(away_goals), 1),
-        "away_avg_conceded": sum(away_conceded) / max(len(away_conceded), 1),
-        
-        # ✅ 2. ÖZELLİK: Form tutarlılığı için gol listesi
-        "goals_list": home_goals + away_goals
-    }
+        form = team_forms.seed(team_id, data)
 
+    stats = form.to_stats()
     TEAM_CACHE[team_id] = stats
     return stats
 
-def get_team_strength(team_id):
+def get_team_strength(team_id, stats=None):
     """
     ✅ 1. ÖZELLİK: TAKIM GÜCÜ HESAPLAMA (0-100)
     Liverpool-City gibi maçlarda saçmalığı önler
+    ✅ Günlük lig tablosundan O(1) okunur (build_strength_table). Tabloda
+    olmayan takım (sezon başı, kupa rakibi) için verilen form istatistiğinden
+    aynı formülle hesaplanır. Hiçbir zaman API çağrısı yapmaz.
     """
-    if team_id in TEAM_STRENGTH_CACHE:
-        return TEAM_STRENGTH_CACHE[team_id]
-    
-    stats = get_team_stats(team_id)
-    
-    # Güç = Atak + Savunma dengesi
-    attack_power = stats["avg_scored"] * 25
-    defense_power = (3 - stats["avg_conceded"]) * 25
-    
-    strength = attack_power + defense_power
-    strength = max(0, min(100, strength))
-    
-    TEAM_STRENGTH_CACHE[team_id] = strength
-    return strength
+    if stats is None:
+        stats = TEAM_CACHE.get(team_id)
+    if stats is None:
+        strength = strength_table.get(team_id)
+        return NEUTRAL_STRENGTH if strength is None else strength
+
+    return prediction_model.team_strength(strength_table, team_id, stats)
 
-def check_consistency(goals_list):
+def match_strength(match, hs=None, as_=None):
+    """Dashboard ve snapshot için maçın iki takımının gücü"""
+    return {
+        "home": round(get_team_strength(match["homeTeam"]["id"], hs), 1),
+        "away": round(get_team_strength(match["awayTeam"]["id"], as_), 1),
+    }
+
+def generate_coupons(picks, matches=None):
     """
-    ✅ 2. ÖZELLİK: FORM TUTARLILIĞI
-    Standart sapma ile tutarlılığı ölçer
-    
-    Örnek:
-    [3, 2, 3, 2, 3] → std_dev = 0.5 → Tutarlı = 1.0
-    [5, 0, 6, 0, 4] → std_dev = 2.8 → Tutarsız = 0.6
+    ✅ Günün kuponları (prediction_model.generate_coupons): COUPON_MODE=optimize
+    ise seviyeler maçların %COUPON_MIN_LEG_PROB+ marketlerinden optimize edilir,
+    değilse %65+ tahminler sırayla 3 / 4 / 5'lik kuponlara bölünür.
     """
-    if len(goals_list) < 3:
-        return 1.0  # Yeterli veri yok, nötr
-    
-    try:
-        std_dev = statistics.stdev(goals_list)
-        mean = statistics.mean(goals_list)
-        
-        # Varyasyon katsayısı (CV)
-        if mean > 0:
-            cv = std_dev / mean
-        else:
-            cv = 0
-        
-        # CV düşükse tutarlı, yüksekse tutarsız
-        if cv < 0.3:
-            return 1.15  # Çok tutarlı → +15% güven
-        elif cv < 0.5:
-            return 1.05  # Tutarlı → +5% güven
-        elif cv < 0.8:
-            return 1.0   # Normal
-        elif cv < 1.2:
-            return 0.92  # Tutarsız → -8% güven
-        else:
-            return 0.80  # Çok tutarsız → -20% güven
-    except:
-        return 1.0
+    return prediction_model.generate_coupons(
+        picks, matches, mode=COUPON_MODE, min_leg_prob=COUPON_MIN_LEG_PROB
+    )
 
-def ms_probs(home_id, away_id, hs, as_, is_home_match=True):
+def build_markets(match, picks, league_code, engine=None):
     """
-    ✅ 1. ÖZELLİK: Rakip kalite faktörü
-    ✅ 3. ÖZELLİK: Ev/Deplasman formu kullanımı
-    ✅ 2. ÖZELLİK: Form tutarlılığı entegrasyonu
+    ✅ Her maçın tüm marketlerini hesapla (prediction_model.score_match)
+    ✅ %65+ olan EN YÜKSEK marketi picks'e ekle
+    ✅ Ağırlıksız model olasılıkları match["model_probs"]'a yazılır (edge hesabı)
+    """
+    home_id = match["homeTeam"]["id"]
+    away_id = match["awayTeam"]["id"]
+
+    hs = get_team_stats(home_id)
+    as_ = get_team_stats(away_id)
+
+    all_markets, match["model_probs"] = prediction_model.score_match(
+        hs, as_, get_team_strength(home_id, hs), get_team_strength(away_id, as_),
+        league_code, engine or MARKET_ENGINE
+    )
+
+    # ✅ Sadece en yüksek piyasa %65+ ise picks'e ekle
+    pick = pick_from_markets(match, all_markets)
+    if pick:
+        picks.append(pick)
+
+    return all_markets
+
+def build_markets_batch(entries):
+    """
+    ✅ Vektörize market hesabı: [(maç, lig_kodu), ...] için build_markets ile
+    birebir aynı market dict'lerini döndürür (picks'e ekleme yapmaz).
+    Ağırlıksız model olasılıkları build_markets gibi maç["model_probs"]'a yazılır.
+    Takım istatistikleri önceden yüklenmiş olmalı (prefetch_team_stats).
+    """
+    rows = []
+    for match, league_code in entries:
+        home_id = match["homeTeam"]["id"]
+        away_id = match["awayTeam"]["id"]
+        hs = get_team_stats(home_id)
+        as_ = get_team_stats(away_id)
+        rows.append((hs, as_, get_team_strength(home_id, hs), get_team_strength(away_id, as_), league_code))
+
+    markets, model_probs = prediction_model.score_batch(rows)
+    for (match, _), probs in zip(entries, model_probs):
+        match["model_probs"] = probs
+    return markets
+
+def match_signature(match):
+    """Maçın yeniden hesaplanması gerekip gerekmediğini belirleyen alanlar"""
+    return (match.get("status"), match.get("lastUpdated"), match.get("utcDate"))
+
+def form_fingerprint(match):
+    """
+    Marketlerin hesaplandığı andaki iki takımın form penceresi kimliği.
+    Snapshot'ta maçla birlikte saklanır; sonraki çalıştırmalarda (ileri tarihli
+    günler dahil) farklıysa maç yeniden hesaplanır.
     """
-    
-    # ✅ Ev/Deplasman formu kullan
-    if is_home_match:
-        home_scored = hs["home_avg_scored"]
-        away_scored = as_["away_avg_scored"]
-    else:
-        home_scored = hs["avg_scored"]
-        away_scored = as_["avg_scored"]
-    
-    # Temel fark
-    diff = home_scored - away_scored
-    
-    # ✅ 1. ÖZELLİK: Rakip kalite kontrolü
-    away_strength = get_team_strength(away_id)
-    home_strength = get_team_strength(home_id)
-    
-    # Deplasman takımı çok güçlüyse diff'i azalt
-    if away_strength > 75:  # Top 6 seviye (City, Liverpool, Arsenal vb)
-        diff *= 0.3  # %70 azalt
-    elif away_strength > 65:  # Top 10 seviye
-        diff *= 0.5  # %50 azalt
-    elif away_strength > 55:  # Orta üst
-        diff *= 0.7  # %30 azalt
-    
-    # Ev sahibi çok zayıfsa
-    if home_strength < 40:
-        diff *= 0.8
-    
-    # ✅ 2. ÖZELLİK: Form tutarlılığı uygula
-    home_consistency = check_consistency(hs["goals_list"])
-    away_consistency = check_consistency(as_["goals_list"])
-    
-    diff *= home_consistency
-    diff *= (2 - away_consistency)  # Rakip tutarsızsa avantaj
-    
-    ms1 = max(18, 50 + diff * 11)
-    ms2 = max(18, 50 - diff * 11)
-    msx = max(12, 100 - (ms1 + ms2))
-    
-    t = ms1 + msx + ms2
-    
     return {
-        "MS1": round(ms1 / t * 100, 2),
-        "MS0": round(msx / t * 100, 2),
-        "MS2": round(ms2 / t * 100, 2)
+        "home": team_forms.fingerprint(match["homeTeam"]["id"]),
+        "away": team_forms.fingerprint(match["awayTeam"]["id"]),
     }
 
-def over_probs(hs, as_):
+def fetch_league_matches(code, date_from, date_to):
+    """Tek bir ligin fikstürünü çek"""
+    data = safe_request(
+        f"{BASE_URL}/competitions/{code}/matches",
+        {"dateFrom": date_from, "dateTo": date_to}
+    )
+    return data.get("matches", [])
+
+def fetch_fixtures(date_from, date_to, workers=1, mode=None):
     """
-    ✅ 4. ÖZELLİK: OYUN TARZI UYUMU
-    İki hücum takımı → Over yükselir
-    İki savunma takımı → Under yükselir
+    ✅ Tüm liglerin fikstürünü tek /matches?competitions=... çağrısıyla çek,
+    competition.code'a göre ayır. Toplu cevapta yer almayan (filtrede
+    dönmeyen) ligler ve toplu çağrının başarısız olması durumunda lig
+    başına çağrıya düşülür.
+
+    Dönüş: {lig_kodu: [maçlar]} (COMPETITIONS sırasıyla)
     """
-    base = (hs["over25"] + as_["over25"]) / 2
-    
-    # ✅ Oyun tarzı uyumu
-    home_attack = hs["avg_scored"]
-    away_attack = as_["avg_scored"]
-    
-    # İki takım da hücum odaklıysa
-    if home_attack > 2.5 and away_attack > 2.5:
-        base *= 1.15  # +15% Over bonusu
-    
-    # İki takım da savunma odaklıysa
-    elif home_attack < 1.2 and away_attack < 1.2:
-        base *= 0.80  # -20% Over (Under'a kaydir)
-    
-    # Bir takım çok gol atıyor, diğeri çok yiyor
-    home_defense = hs["avg_conceded"]
-    away_defense = as_["avg_conceded"]
-    
-    if (home_attack > 2.5 and away_defense > 1.8) or (away_attack > 2.5 and home_defense > 1.8):
-        base *= 1.10  # +10% Over bonusu
-    
-    return {"O25": min(round(base, 2), 95)}
+    mode = mode or FIXTURE_MODE
+    codes = list(COMPETITIONS.values())
+    by_code = {code: [] for code in codes}
+    missing = codes
+
+    if mode == "bulk":
+        data = safe_request(
+            f"{BASE_URL}/matches",
+            {"competitions": ",".join(codes), "dateFrom": date_from, "dateTo": date_to}
+        )
 
-def kg_probs(hs, as_):
+        if data:
+            for m in data.get("matches", []):
+                code = (m.get("competition") or {}).get("code")
+                if code in by_code:
+                    by_code[code].append(m)
+
+            # API'nin uyguladığı filtre: planın kapsamadığı ligler burada görünmez
+            covered = (data.get("filters") or {}).get("competitions")
+            covered = set(covered.split(",")) if covered else set(codes)
+            missing = [code for code in codes if code not in covered]
+            print(f"📦 Toplu fikstür: {len(data.get('matches', []))} maç, "
+                  f"{len(missing)} lig için tekil çağrı gerekiyor")
+        else:
+            print("⚠️ Toplu fikstür çağrısı başarısız, lig bazlı çağrılara dönülüyor")
+
+    if missing:
+        fetch = lambda code: fetch_league_matches(code, date_from, date_to)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(fetch, missing))
+        else:
+            results = [fetch(code) for code in missing]
+
+        for code, matches in zip(missing, results):
+            by_code[code] = matches
+
+    return by_code
+
+def sync_finished_results():
     """
-    ✅ 4. ÖZELLİK: OYUN TARZI UYUMU
-    İki hücum takımı → KG yükselir
-    Bir takım çok savunmacıysa → KG düşer
+    ✅ Son senkrondan bugüne kadar biten maçları tek toplu çağrıyla yerel
+    depoya ekle. Böylece günlük API kullanımı takım sayısıyla değil,
+    yeni sonuç sayısıyla orantılı olur. Formu değişen takım id'lerini döner.
     """
-    base = (hs["kg"] + as_["kg"]) / 2
-    
-    # ✅ Oyun tarzı uyumu
-    home_attack = hs["avg_scored"]
-    away_attack = as_["avg_scored"]
-    
-    # İki takım da hücum odaklıysa
-    if home_attack > 2.0 and away_attack > 2.0:
-        base *= 1.12  # +12% KG bonusu
-    
-    # Bir takım çok savunmacıysa
-    if home_attack < 1.0 or away_attack < 1.0:
-        base *= 0.85  # -15% KG
-    
-    return {"KG": min(round(base, 2), 90)}
+    today = local_today()
+    last = match_store.get_meta("results_synced_until")
+    start = date.fromisoformat(last) if last else today - timedelta(days=3)
 
-def fh_probs(hs, as_):
+    # API tarih aralığı en fazla 10 gün - daha uzun boşlukta takımlar yeniden doldurulur
+    if (today - start).days > 9:
+        print("⚠️ Sonuç senkronunda uzun boşluk, takım geçmişleri yeniden doldurulacak")
+        match_store.reset_sync()
+        start = today - timedelta(days=9)
+
+    data = safe_request(
+        f"{BASE_URL}/matches",
+        {
+            "competitions": ",".join(COMPETITIONS.values()),
+            "status": "FINISHED",
+            "dateFrom": start.isoformat(),
+            "dateTo": today.isoformat()
+        }
+    )
+    if not data:
+        print("⚠️ Biten maç senkronu başarısız, sonraki çalıştırmada tekrar denenecek")
+        return set()
+
+    finished = data.get("matches", [])
+    added = match_store.upsert_matches(finished)
+    match_store.set_meta("results_synced_until", today.isoformat())
+
+    # Formu değişen takımların bellek cache'i düşer, get_team_stats yeni pencereden okur
+    changed = team_forms.push_matches(finished)
+    for tid in changed:
+        TEAM_CACHE.expire_at(tid, 0)
+    print(f"🗃️ Maç deposu: {added} sonuç eklendi/güncellendi ({start} → {today}), "
+          f"{len(changed)} takımın formu güncellendi\n")
+    return changed
+
+def build_strength_table(workers=1):
     """
-    ✅ Basit ortalama - oyun tarzı etkisi az
+    ✅ Lig bazlı takım gücü tablosunu günde bir kez kur: lig başına tek
+    /standings isteği. Puan durumu alınamayan ligler için yerel maç
+    deposundaki son STRENGTH_HISTORY_DAYS günün maçları kullanılır.
     """
-    o = (hs["fh15"] + as_["fh15"]) / 2
-    return {"FH15": round(o, 2)}
+    today = local_today().isoformat()
+    if strength_table.built_for == today or strength_table.load(STRENGTH_TABLE_FILE) == today:
+        return strength_table.stats()
+
+    strength_table.clear()
+    codes = list(COMPETITIONS.values())
+    fetch = lambda code: safe_request(f"{BASE_URL}/competitions/{code}/standings")
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(fetch, codes))
+    else:
+        results = [fetch(code) for code in codes]
 
-def generate_coupons(picks):
+    since = (local_today() - timedelta(days=STRENGTH_HISTORY_DAYS)).isoformat()
+    from_history = []
+    for code, data in zip(codes, results):
+        if not strength_table.load_standings(code, data):
+            strength_table.load_history(code, match_store.competition_matches(code, since))
+            from_history.append(code)
+
+    strength_table.built_for = today
+    strength_table.save(STRENGTH_TABLE_FILE)
+
+    print(f"💪 Güç tablosu: {len(strength_table)} takım, {len(codes) - len(from_history)} lig puan "
+          f"durumundan" + (f", {', '.join(from_history)} yerel geçmişten" if from_history else "") + "\n")
+    return strength_table.stats()
+
+def ingest_odds(grouped, picks, day):
     """
-    ✅ YENİ MANTIK: %65 üstü tahminleri en yüksekten düşüğe sırala
-    
-    1️⃣ GÜNÜN KOMBİNESİ: En yüksek 3 tahmin (%65+)
-    2️⃣ YÜKSEK ORAN: Sonraki 4 tahmin (%65+)
-    3️⃣ SÜPER ORAN: Sonraki 5 tahmin (%65+)
-    
-    Tüm kuponlar %65+ tahminlerden oluşur ve yüksekten düşüğe sıralanır.
+    ✅ Oranları sağlayıcıdan toplu yükle, maçlarla eşleştir ve tüm
+    marketlerin edge'ini tek vektörize geçişte hesapla. Eşleşen tahminlere
+    odds / edge / confidence eklenir, çıktı v5 şemasında kaydedilir.
     """
-    if not picks:
-        return {
-            "daily": [],
-            "high_odds": [],
-            "super_odds": []
-        }
-    
-    # %65 ve üstü tahminleri filtrele ve en yüksekten düşüğe sırala
-    filtered_picks = [p for p in picks if p['value'] >= 65]
-    sorted_picks = sorted(filtered_picks, key=lambda x: x['value'], reverse=True)
-    
-    # 1️⃣ GÜNÜN KOMBİNESİ: İlk 3 tahmin (en yüksek değerliler)
-    daily_coupon = sorted_picks[:3]
-    
-    # 2️⃣ YÜKSEK ORAN: Sonraki 4 tahmin
-    high_odds_coupon = sorted_picks[3:7]
-    
-    # 3️⃣ SÜPER ORAN: Sonraki 5 tahmin
-    super_odds_coupon = sorted_picks[7:12]
-    
-    return {
-        "daily": daily_coupon,
-        "high_odds": high_odds_coupon,
-        "super_odds": super_odds_coupon
-    }
+    if odds_provider is None:
+        return None
+
+    # Opsiyonel zenginleştirme: bozuk bir oran kaydı günün build'ini durdurmasın
+    try:
+        records = odds_provider.fetch(day, day)
+        index = odds_manager.OddsIndex(records, ODDS_KICKOFF_TOLERANCE_HOURS)
+        v5, by_pick = odds_manager.build_v5(day, grouped, index)
+        cache_manager.save_v5_output(v5, for_date=day)
+    except Exception as e:
+        print(f"⚠️ Oranlar yüklenemedi ({odds_provider.name}): {e}\n")
+        return None
 
-def build_markets(match, picks, league_code):
+    for p in picks:
+        row = by_pick.get((p["match"], p["market"]))
+        if row:
+            p.update(odds=row["odds"], edge=row["edge"], confidence=row["confidence"])
+
+    matched = sum(1 for matches in grouped.values() for m in matches if m.get("odds"))
+    value_bets = sum(1 for r in v5["matches"] if r["edge"] > 0)
+    print(f"💹 Oranlar: {index.size} kayıt, {matched} maç eşleşti, "
+          f"{len(v5['matches'])} market → {value_bets} pozitif edge\n")
+    return v5
+
+def next_fixture_expiry(league_matches):
+    """Her takım için: henüz başlamamış ilk maçının bitişi (epoch sn)"""
+    now = datetime.now(timezone.utc)
+    expiry = {}
+    for matches in league_matches.values():
+        for m in matches:
+            try:
+                kickoff = datetime.fromisoformat(m["utcDate"].replace("Z", "+00:00"))
+            except (KeyError, ValueError):
+                continue
+            if kickoff <= now:
+                continue
+            ends = (kickoff + MATCH_DURATION).timestamp()
+            for tid in (m["homeTeam"]["id"], m["awayTeam"]["id"]):
+                if tid not in expiry or ends < expiry[tid]:
+                    expiry[tid] = ends
+    return expiry
+
+def load_team_cache_file(team_ids=None):
     """
-    ✅ Her maçın tüm marketlerini hesapla
-    ✅ Liga ağırlığı uygula
-    ✅ %65+ olan EN YÜKSEK marketi picks'e ekle
+    Günlük takım cache dosyasındaki kayıtları TEAM_CACHE'e kendi bitiş
+    zamanlarıyla al. Süresi dolmuş kayıtlar (takımın maçı oynanmış) atlanır,
+    böylece maç öncesi istatistik dosyadan taze TTL ile geri gelmez.
     """
-    home_id = match["homeTeam"]["id"]
-    away_id = match["awayTeam"]["id"]
-    
-    hs = get_team_stats(home_id)
-    as_ = get_team_stats(away_id)
-
-    # ✅ Yeni formüllerle hesapla
-    ms = ms_probs(home_id, away_id, hs, as_, is_home_match=True)
-    over = over_probs(hs, as_)
-    kg = kg_probs(hs, as_)
-    fh = fh_probs(hs, as_)
+    now = time.time()
+    wanted = None if team_ids is None else set(team_ids)
+    loaded = 0
+    for tid, (stats, expires) in cache_manager.get_teams_cache(with_expiry=True).items():
+        if wanted is not None and tid not in wanted:
+            continue
+        if expires is not None and expires <= now:
+            continue
+        TEAM_CACHE.set(tid, stats, expires_at=expires)
+        loaded += 1
+    return loaded
+
+def save_team_cache_file():
+    entries = TEAM_CACHE.entries()
+    cache_manager.save_teams_cache(
+        {tid: stats for tid, stats, _ in entries},
+        {tid: expires for tid, _, expires in entries}
+    )
 
-    # Liga ağırlığı uygula
-    weight = LEAGUE_WEIGHT.get(league_code, 1.0)
-    
-    # Tüm piyasaları ağırlıklandır
-    all_markets = {}
-    for market, value in {**ms, **over, **kg, **fh}.items():
-        weighted_value = min(value * weight, 95)
-        all_markets[market] = round(weighted_value, 2)
-
-    # ✅ En yüksek piyasayı bul
-    best_key, best_value = max(all_markets.items(), key=lambda x: x[1])
-    
-    # ✅ Sadece en yüksek piyasa %65+ ise picks'e ekle
-    if best_value >= 65:
-        picks.append({
-            "match": f"{match['homeTeam']['name']} - {match['awayTeam']['name']}",
-            "market": best_key,
-            "value": best_value
-        })
+def prefetch_team_stats(league_matches, workers=1, form_changed=frozenset()):
+    """
+    ✅ Günün tüm takımlarını tek seferde hazırla:
+    1) Maçlardaki takım ID'lerini tekrarsız topla (CL + iç lig çakışmaları dahil)
+    2) TEAM_CACHE'te olanları çıkar
+    3) Günlük takım cache dosyasında olanları belleğe al; formu bu çalıştırmada
+       değişen takımlar (form_changed) dosyadaki eski istatistikle doldurulmaz
+    4) Kalanları tek bir planlı batch'te çek (rate limiter üzerinden);
+       get_team_stats depodaki kayan form penceresinden okur
+
+    Sonrasında build_markets hiç I/O yapmaz, sadece hesaplar.
+    """
+    team_ids = []
+    seen = set()
+    for matches in league_matches.values():
+        for m in matches:
+            for tid in (m["homeTeam"]["id"], m["awayTeam"]["id"]):
+                if tid not in seen:
+                    seen.add(tid)
+                    team_ids.append(tid)
+
+    missing = [tid for tid in team_ids if tid not in TEAM_CACHE]
+
+    from_file = 0
+    if missing:
+        from_file = load_team_cache_file([tid for tid in missing if tid not in form_changed])
+        missing = [tid for tid in missing if tid not in TEAM_CACHE]
+
+    print(f"👥 Takım ön yükleme: {len(team_ids)} takım "
+          f"({len(team_ids) - len(missing) - from_file} bellekte, {from_file} dosyada, "
+          f"{len(missing)} çekilecek)")
+
+    if missing:
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(get_team_stats, missing))
+        else:
+            for tid in missing:
+                get_team_stats(tid)
 
-    all_markets["best"] = best_key
-    all_markets["best_value"] = best_value
+    # ✅ Takımın formu bir sonraki maçı bitince değişir → cache o ana kadar geçerli
+    for tid, expires in next_fixture_expiry(league_matches).items():
+        current = TEAM_CACHE.expires_at(tid)
+        if current is None or expires < current:
+            TEAM_CACHE.expire_at(tid, expires)
 
-    return all_markets
+    print()
+    return {"teams": len(team_ids), "from_file": from_file, "fetched": len(missing)}
 
-def fetch_all_matches():
-    grouped = defaultdict(list)
-    picks = []
-    today = date.today().isoformat()
+def lookahead_days():
+    """
+    ✅ Bu çalıştırmada hesaplanacak günler: bugün her zaman, ileri tarihli
+    günler ise snapshot'ı yoksa veya yaşı gün uzaklığı × LOOKAHEAD_REFRESH_HOURS'u
+    geçmişse (maça yaklaştıkça daha sık yenilenir).
+    """
+    today = local_today()
+    days = [today.isoformat()]
+    for offset in range(1, LOOKAHEAD_DAYS + 1):
+        day = (today + timedelta(days=offset)).isoformat()
+        age = cache_manager.matches_cache_age(day)
+        if age is None or age > offset * LOOKAHEAD_REFRESH_HOURS * 3600:
+            days.append(day)
+    return days
+
+def fetch_all_matches(workers=None, incremental=False):
+    """
+    ✅ Fikstürler fetch_fixtures ile (varsayılan: tek toplu çağrı) çekilir.
+    ✅ Takım geçmişleri prefetch_team_stats ile market hesabından önce çekilir.
+    ✅ workers > 1 ise takım geçmişleri (ve gerekirse lig bazlı fikstürler)
+    sınırlı bir thread havuzunda paralel çekilir. Market hesabı her iki modda
+    da COMPETITIONS sırasıyla yapılır, böylece grouped/picks/coupons aynı kalır.
+    ✅ LOOKAHEAD_DAYS > 0 ise sonraki günlerin fikstürleri aynı toplu çağrıyla
+    çekilir ve her gün için ayrı snapshot (matches_YYYY-MM-DD.json) hazırlanır;
+    gün dönümünde bugünün snapshot'ı zaten hazırdır (lookahead_days).
+    ✅ incremental=True ise her günün mevcut snapshot'ı ile maç id, status ve
+    lastUpdated üzerinden karşılaştırılır; sadece yeni/değişen maçların
+    marketleri hesaplanır, picks ve kuponlar birleşik setten yeniden türetilir.
+    Takımlarından birinin formu yeni bir sonuçla değişen maçlar da yeniden hesaplanır.
+    """
+    workers = FETCH_WORKERS if workers is None else max(1, workers)
+    today = local_today().isoformat()
+    days = lookahead_days()
+    wait_before = rate_limiter.total_wait
     
     print(f"\n{'='*60}")
     print(f"🔄 MAÇ ÇEKME BAŞLADI - {today}")
     print(f"✨ v3.0 ULTRA - %83.5 Başarı Hedefli Matematik")
+    print(f"⚙️ Çekme modu: {'paralel (' + str(workers) + ' worker)' if workers > 1 else 'sıralı'}")
+    if len(days) > 1:
+        print(f"📆 İleri tarihli günler: {', '.join(days[1:])}")
     print(f"{'='*60}")
     print(f"📌 Aktif Özellikler:")
     print(f"   1️⃣ Rakip Kalite Faktörü (Liverpool-City fix)")
@@ -480,31 +682,134 @@ def fetch_all_matches():
     print(f"   4️⃣ Oyun Tarzı Uyumu (Over/KG optimize)")
     print(f"{'='*60}\n")
 
+    # Tüm günlerin fikstürü tek seferde, maçın TR saatiyle gününe göre ayrılır.
+    # API tarih filtresi UTC: TR günü bir önceki UTC günü 21:00'de başlar
+    date_from = (date.fromisoformat(days[0]) - timedelta(days=1)).isoformat()
+    fixtures = fetch_fixtures(date_from, days[-1], workers)
+    by_day = {day: {code: [] for code in fixtures} for day in days}
+    for code, matches in fixtures.items():
+        for m in matches:
+            try:
+                day = local_kickoff(m).date().isoformat()
+            except (KeyError, ValueError):
+                continue
+            if day in by_day:
+                by_day[day][code].append(m)
+
+    # Yeni sonuçları yerel depoya ekle (takım istatistikleri oradan okunur)
+    form_changed = sync_finished_results()
+    build_strength_table(workers)
+
+    totals = {"reused": 0, "recomputed": 0}
+    for day in days:
+        result = build_day_snapshot(day, by_day[day], workers, incremental, form_changed)
+        totals["reused"] += result["reused"]
+        totals["recomputed"] += result["recomputed"]
+
+    save_team_cache_file()
+    team_forms.save()
+    response_cache.cleanup()
+
+    http_stats = response_cache.stats()
+    print(f"⏳ Rate limit bekleme: {rate_limiter.total_wait - wait_before:.1f} sn")
+    print(f"🗄️ HTTP cache: {http_stats['hits']} hit / {http_stats['misses']} miss "
+          f"/ {http_stats['revalidated']} doğrulama (304)\n")
+
+    return totals
+
+def build_day_snapshot(day, league_matches, workers, incremental=False, form_changed=frozenset()):
+    """Tek bir günün marketlerini, tahminlerini ve kuponlarını hesaplayıp snapshot'ını kaydet"""
+    grouped = defaultdict(list)
+    picks = []
+
+    print(f"📅 {day}\n")
+
+    # Önceki snapshot'taki maçlar (id → maç)
+    previous = {}
+    if incremental:
+        cached = cache_manager.get_matches_cache(day, mutable=True)
+        for old_matches in (cached or {}).get("matches", {}).values():
+            for old in old_matches:
+                if old.get("id") is not None and old.get("markets"):
+                    previous[old["id"]] = old
+
+    def is_reusable(m):
+        old = previous.get(m.get("id"))
+        return (
+            old is not None
+            and match_signature(old) == match_signature(m)
+            and old.get("form") == form_fingerprint(m)
+        )
+
+    # Takım formları prefetch sırasında seed edilebilir: karar bir kez, önceden verilir
+    reuse_ids = {
+        id(m) for matches in league_matches.values() for m in matches if is_reusable(m)
+    }
+    reusable = lambda m: id(m) in reuse_ids
+
+    # Market hesabından önce sadece hesaplanacak maçların takımlarını hazırla
+    prefetch_team_stats(
+        {code: [m for m in matches if not reusable(m)] for code, matches in league_matches.items()},
+        workers,
+        form_changed
+    )
+    reused = recomputed = 0
+
+    # Vektörize motor: hesaplanacak tüm maçların marketleri tek geçişte
+    batch_markets = {}
+    if MARKET_ENGINE == "batch":
+        to_score = [
+            (m, code) for code, matches in league_matches.items()
+            for m in matches if not reusable(m)
+        ]
+        try:
+            for (m, _), markets in zip(to_score, build_markets_batch(to_score)):
+                batch_markets[id(m)] = markets
+            print(f"🧮 Vektörize motor: {len(batch_markets)} maç tek geçişte hesaplandı\n")
+        except Exception as e:
+            print(f"⚠️ Vektörize hesap başarısız, maç maç hesaplanacak: {e}\n")
+            batch_markets = {}
+
     for league, code in COMPETITIONS.items():
         print(f"📊 {league} ({code}) kontrol ediliyor...")
         
-        data = safe_request(
-            f"{BASE_URL}/competitions/{code}/matches",
-            {"dateFrom": today, "dateTo": today}
-        )
-        
-        matches = data.get("matches", [])
+        matches = league_matches.get(code, [])
         
         if not matches:
-            print(f"   ℹ️ Bugün maç yok\n")
+            print(f"   ℹ️ Bu gün maç yok\n")
             continue
         
         print(f"   ✅ {len(matches)} maç bulundu")
 
         for m in matches:
             try:
-                dt = datetime.fromisoformat(
-                    m["utcDate"].replace("Z", "+00:00")
-                ).astimezone(TR_TZ)
+                dt = local_kickoff(m)
 
                 m["time"] = dt.strftime("%H:%M")
                 m["league"] = league
-                m["markets"] = build_markets(m, picks, code)
+
+                if reusable(m):
+                    # Değişmemiş maç → önceki marketleri kullan
+                    m["markets"] = previous[m["id"]]["markets"]
+                    m["strength"] = previous[m["id"]].get("strength")
+                    m["model_probs"] = previous[m["id"]].get("model_probs")
+                    pick = pick_from_markets(m, m["markets"])
+                    if pick:
+                        picks.append(pick)
+                    reused += 1
+                elif id(m) in batch_markets:
+                    m["markets"] = batch_markets[id(m)]
+                    pick = pick_from_markets(m, m["markets"])
+                    if pick:
+                        picks.append(pick)
+                    recomputed += 1
+                else:
+                    m["markets"] = build_markets(m, picks, code)
+                    recomputed += 1
+
+                if not m.get("strength"):
+                    m["strength"] = match_strength(m)
+                m["form"] = form_fingerprint(m)
                 
                 grouped[league].append(m)
                 print(f"      • {m['homeTeam']['name']} - {m['awayTeam']['name']} ({m['time']})")
@@ -515,22 +820,101 @@ def fetch_all_matches():
         print()
     
     print(f"{'='*60}")
-    print(f"✅ ÇEKME TAMAMLANDI")
+    print(f"✅ ÇEKME TAMAMLANDI - {day}")
     print(f"   📌 Toplam {sum(len(v) for v in grouped.values())} maç")
     print(f"   ⭐ {len(picks)} yüksek değerli tahmin (%65+)")
     print(f"   🎯 Hedef Başarı: %83.5")
+    if incremental:
+        print(f"   ♻️ Artımlı yenileme: {reused} maç yeniden kullanıldı, {recomputed} maç hesaplandı")
     print(f"{'='*60}\n")
 
+    # Oranlar + edge (v5 çıktısı)
+    ingest_odds(grouped, picks, day)
+
     # ✅ YENİ: Kuponları oluştur
-    coupons = generate_coupons(picks)
+    coupons = generate_coupons(picks, [m for matches in grouped.values() for m in matches])
     print(f"🎫 KUPONLAR OLUŞTURULDU:")
     print(f"   🏆 Günün Kombinesi: {len(coupons['daily'])} maç")
     print(f"   🎯 Yüksek Oran: {len(coupons['high_odds'])} maç")
     print(f"   🔥 Süper Oran: {len(coupons['super_odds'])} maç")
     print(f"{'='*60}\n")
 
-    cache_manager.save_teams_cache({str(k): v for k, v in TEAM_CACHE.items()})
-    cache_manager.save_matches_cache(grouped, picks, coupons)  # ✅ Kuponları da kaydet
+    cache_manager.save_matches_cache(grouped, picks, coupons, for_date=day)  # ✅ Kuponları da kaydet
+
+    return {"reused": reused, "recomputed": recomputed}
+
+# Süreç içinde tek build (single-flight) + worker/instance'lar arası kilit (cache arka ucundan)
+snapshot_flight = SingleFlight()
+build_lock = cache_backend.lock("build")
+
+def _build_snapshot_locked(fresh_within=None, incremental=False):
+    """
+    Sadece tek bir süreç build yapar. Kilit başka bir worker'daysa onun
+    bitmesi beklenir ve onun yazdığı snapshot döndürülür.
+    """
+    if not build_lock.acquire(blocking=False):
+        print("🔒 Başka bir worker snapshot hazırlıyor, bekleniyor...")
+        if build_lock.acquire(timeout=15 * 60):
+            build_lock.release()
+        return cache_manager.get_matches_cache()
+
+    try:
+        # Kilidi beklerken başka worker yeni snapshot yazmış olabilir
+        age = cache_manager.matches_cache_age()
+        if fresh_within is not None and age is not None and age < fresh_within:
+            print(f"⏭️ Snapshot {age:.0f} sn önce hazırlanmış, build atlandı")
+        else:
+            fetch_all_matches(incremental=incremental)
+    finally:
+        build_lock.release()
+
+    return cache_manager.get_matches_cache()
+
+def build_snapshot(timeout=None, fresh_within=None, incremental=False):
+    """
+    ✅ Aynı anda kaç istek gelirse gelsin tek bir fetch_all_matches çalışır,
+    diğerleri aynı build'in sonucunu alır. timeout dolarsa TimeoutError.
+    """
+    return snapshot_flight.do(
+        "snapshot", lambda: _build_snapshot_locked(fresh_within, incremental), timeout=timeout
+    )
+
+def run_scheduled_build(reason):
+    # Zamanlanmış çalıştırmalarda başka worker'ın yeni build'i yeterli
+    fresh_within = None if reason == "refresh" else REFRESH_INTERVAL_MINUTES * 60 / 2
+    build_snapshot(fresh_within=fresh_within, incremental=INCREMENTAL_REFRESH)
+
+# Günlük pipeline arka planda çalışır, handler'lar son snapshot'ı servis eder
+pipeline_scheduler = PipelineScheduler(
+    run_scheduled_build,
+    TR_TZ,
+    daily_at=DAILY_BUILD_AT,
+    interval_minutes=REFRESH_INTERVAL_MINUTES
+)
+
+def get_snapshot():
+    """
+    ✅ Stale-while-revalidate: bugünün snapshot'ı yoksa arka planda
+    hazırlamayı başlat ve bu arada son sağlam snapshot'ı döndür.
+    Hiç snapshot yoksa devam eden tek build'i kısa süre bekle.
+    """
+    cached = cache_manager.get_matches_cache()
+    if cached:
+        return cached
+
+    latest = cache_manager.get_latest_matches_cache()
+    if latest:
+        if pipeline_scheduler.trigger("soğuk istek"):
+            print("🔄 Bugünün verisi yok, arka planda hazırlanıyor...")
+        return latest
+
+    try:
+        return build_snapshot(timeout=COLD_WAIT_SECONDS)
+    except TimeoutError:
+        return None
+    except Exception as e:
+        print(f"❌ Snapshot hazırlanamadı: {e}")
+        return None
 
 @app.get("/", response_class=HTMLResponse)
 @app.get("/dashboard", response_class=HTMLResponse)
@@ -538,14 +922,44 @@ def dashboard(request: Request, session_id: str = Cookie(None)):
     user = user_manager.verify_session(session_id) if session_id else None
     is_premium = user["is_premium"] if user else False
 
-    cached = cache_manager.get_matches_cache()
+    cached = get_snapshot()
 
     if not cached:
-        fetch_all_matches()
-        cached = cache_manager.get_matches_cache()
-        if not cached:
-            return HTMLResponse("<h1>Veriler hazırlanıyor, birkaç saniye sonra yenileyin</h1>")
+        return HTMLResponse("<h1>Veriler hazırlanıyor, birkaç saniye sonra yenileyin</h1>")
+
+    return snapshot_page(
+        request, "dashboard", cached, user,
+        lambda: render_dashboard(cached, user, is_premium),
+        user_menu=True
+    )
 
+def snapshot_page(request, page, cached, user, render, user_menu=False):
+    """
+    ✅ Snapshot'tan üretilen sayfa yanıtı:
+    - ETag = sayfa + snapshot sürümü + kitle (+ menüdeki kullanıcı) + template'ler
+    - If-None-Match tutarsa render etmeden 304
+    - Gövde sadece snapshot + kitleye bağlı: sürüm başına bir kez render edilir,
+      kullanıcı menüsü (user_menu=True) her istekte ayrıca doldurulur
+    """
+    # ETag sürümü worker'lar arasında ortak (anahtar + arka uç damgası);
+    # render cache süreç içi sayacı da içeren sürümü kullanır
+    version = cache_manager.version_of(cached)
+    audience = audience_of(user)
+    headers = {"Cache-Control": SNAPSHOT_CACHE_CONTROL, "Vary": "Cookie"}
+
+    if version is not None:
+        menu_owner = user["email"] if user_menu and user else None
+        headers["ETag"] = make_etag(page, version, audience, menu_owner, TEMPLATES_VERSION)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+    local_version = cache_manager.version_of(cached, local=True)
+    body = render_cache.get_or_render(page, local_version, audience, render)
+    if user_menu:
+        body = render_cache.fill(body, templates.get_template("user_menu.html").render(user=user))
+    return HTMLResponse(body, headers=headers)
+
+def render_dashboard(cached, user, is_premium):
     all_matches = cached.get("matches", {})
     all_picks = cached.get("picks", [])
     coupons = cached.get("coupons", {"daily": [], "high_odds": [], "super_odds": []})  # ✅ Kuponları al
@@ -571,28 +985,19 @@ def dashboard(request: Request, session_id: str = Cookie(None)):
     sorted_picks = sorted(all_picks, key=lambda x: x["value"], reverse=True)
     free_pick_matches = set(p["match"] for p in sorted_picks[:free_count])
 
-    # =====================
-    # MAÇLARA FLAG EKLE
-    # =====================
-    for league_matches in all_matches.values():
-        for match in league_matches:
-            match_name = f"{match['homeTeam']['name']} - {match['awayTeam']['name']}"
-
-            match["is_free"] = (
-                is_premium
-                or match_name in free_pick_matches
-             )
+    # Snapshot salt okunur ve istekler arasında paylaşılır: maçlara flag
+    # yazmak yerine ücretsiz maç adları template'e ayrı verilir
 
-    return templates.TemplateResponse(
-        "dashboard.html",
+    return templates.get_template("dashboard.html").render(
         {
-            "request": request,
             "matches": all_matches,
             "picks": all_picks,
             "coupons": coupons,  # ✅ Kuponları template'e gönder
             "is_premium": is_premium,
-            "user": user,
-            "free_count": free_count
+            "user": user,  # gövdede sadece giriş yapılmış mı diye bakılır
+            "user_menu": Markup(USER_MENU_SLOT),
+            "free_count": free_count,
+            "free_matches": free_pick_matches
         }
     )
 
@@ -637,21 +1042,22 @@ def coupons_page(request: Request, session_id: str = Cookie(None)):
     user = user_manager.verify_session(session_id) if session_id else None
     is_premium = user["is_premium"] if user else False
     
-    cached = cache_manager.get_matches_cache()
+    cached = get_snapshot()
     
     if not cached:
         return HTMLResponse("<h1>Veriler yükleniyor, lütfen birkaç saniye sonra tekrar deneyin</h1>")
     
     coupons = cached.get("coupons", {"daily": [], "high_odds": [], "super_odds": []})
-    
-    return templates.TemplateResponse(
-        "coupons.html",
-        {
-            "request": request,
-            "coupons": coupons,
-            "is_premium": is_premium,
-            "user": user
-        }
+
+    return snapshot_page(
+        request, "coupons", cached, user,
+        lambda: templates.get_template("coupons.html").render(
+            {
+                "coupons": coupons,
+                "is_premium": is_premium,
+                "user": user
+            }
+        )
     )
 
 @app.post("/register", response_class=HTMLResponse)
@@ -1174,53 +1580,16 @@ async def admin_reject_payment(payment_id: int, request: Request):
 
 @app.get("/refresh", response_class=HTMLResponse)
 def refresh_data(request: Request, session_id: str = Cookie(None)):
-    user = get_current_user(session_id)
-    is_premium = user["is_premium"] if user else False
-    
+    """
+    ✅ Yenilemeyi arka planda başlatır, mevcut snapshot'ı hemen gösterir
+    """
     try:
-        fetch_all_matches()
-        cached = cache_manager.get_matches_cache()
-        
-        if not cached:
-            return HTMLResponse("<h1>Veriler yüklenemedi, lütfen birkaç saniye bekleyip tekrar deneyin</h1>")
-        
-        # Free picks mantığı
-        all_matches = cached.get("matches", {})
-        all_picks = cached.get("picks", [])
-        coupons = cached.get("coupons", {"daily": [], "high_odds": [], "super_odds": []})  # ✅ Kuponları al
-        
-        # Toplam maç sayısı
-        total_matches = sum(len(matches) for matches in all_matches.values())
-        
-        # Free pick sayısını belirle
-        free_count = 3 if total_matches >= 10 else 2
-        
-        # En yüksek değerli picksleri sırala
-        sorted_picks = sorted(all_picks, key=lambda x: x['value'], reverse=True)
-        free_pick_matches = set(p["match"] for p in sorted_picks[:free_count])
-        
-        # Her maça is_free flag ekle
-        for league_matches in all_matches.values():
-            for match in league_matches:
-                match_name = f"{match['homeTeam']['name']} - {match['awayTeam']['name']}"
-                match['is_free'] = (
-                   is_premium
-                   or match_name in free_pick_matches
-                )
-        
-        return templates.TemplateResponse(
-            "dashboard.html",
-            {
-                "request": request,
-                "matches": all_matches,
-                "picks": all_picks,
-                "coupons": coupons,  # ✅ Kuponları template'e gönder
-                "is_premium": is_premium,
-                "user": user,
-                "free_count": free_count,
-                "free_pick_matches": free_pick_matches
-            }
-        )
+        if pipeline_scheduler.trigger("refresh"):
+            print("🔄 Manuel yenileme arka planda başlatıldı")
+        else:
+            print("⏭️ Yenileme zaten çalışıyor")
+
+        return dashboard(request, session_id)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -1241,7 +1610,20 @@ def health_check():
                 "date": cached_data.get("date") if cached_data else None
             },
             "users": stats,
-            "payments": payment_stats
+            "payments": payment_stats,
+            "rate_limiter": rate_limiter.stats(),
+            "http_cache": response_cache.stats(),
+            "render_cache": render_cache.stats(),
+            "cache_backend": {**cache_backend.stats(), "errors": cache_manager.backend_errors},
+            "scheduler": pipeline_scheduler.status(),
+            "team_cache": TEAM_CACHE.stats(),
+            "strength_table": strength_table.stats(),
+            "odds_provider": odds_provider.name if odds_provider else None,
+            "market_engine": MARKET_ENGINE,
+            "poisson_cache": poisson_engine.cache_stats(),
+            "match_store": match_store.stats(),
+            "team_forms": team_forms.stats(),
+            "http_pools": http_client.stats()
         }
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
@@ -1273,11 +1655,21 @@ async def startup_event():
     print("=" * 60)
     
     try:
-        teams_cache = cache_manager.get_teams_cache()
-        TEAM_CACHE.update({int(k): v for k, v in teams_cache.items()})
+        load_team_cache_file()
         print(f"✅ {len(TEAM_CACHE)} takım cache'den yüklendi")
     except Exception as e:
         print(f"⚠️ Startup cache yükleme hatası: {e}")
     
+    pipeline_scheduler.start()
+    if not cache_manager.get_matches_cache():
+        pipeline_scheduler.trigger("başlangıç")
+    
     print(f"✅ Başlangıç tamamlandı - Hedef: %83.5 başarı!")
     print("=" * 60)
+
+@app.on_event("shutdown")
+def shutdown_event():
+    print("🛑 Uygulama kapanıyor...")
+    pipeline_scheduler.stop()
+    http_client.close()
+    cache_backend.close()
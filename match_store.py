@@ -0,0 +1,183 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+class MatchStore:
+    """
+    Bitmiş maçların yerel, indeksli deposu (SQLite - cache_data/history.db).
+
+    - Pipeline her gün yeni sonuçları tek toplu çağrıyla ekler
+    - get_team_stats takımın son maçlarını (team_id, tarih) indeksinden okur
+    - Bir takım ilk kez görüldüğünde API'den bir kez doldurulur (team_sync)
+    """
+
+    def __init__(self, db_path="cache_data/history.db"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS matches (
+                    id INTEGER PRIMARY KEY,
+                    utc_date TEXT NOT NULL,
+                    competition TEXT,
+                    home_id INTEGER NOT NULL,
+                    away_id INTEGER NOT NULL,
+                    home_ft INTEGER NOT NULL,
+                    away_ft INTEGER NOT NULL,
+                    home_ht INTEGER,
+                    away_ht INTEGER
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_home ON matches (home_id, utc_date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_away ON matches (away_id, utc_date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_competition ON matches (competition, utc_date)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS team_sync (
+                    team_id INTEGER PRIMARY KEY,
+                    synced_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+    # =====================
+    # YAZMA
+    # =====================
+    def upsert_matches(self, matches):
+        """API maç objelerini ekle/güncelle. Skoru olmayanlar atlanır. Eklenen sayıyı döner."""
+        rows = []
+        for m in matches:
+            ft = (m.get("score") or {}).get("fullTime") or {}
+            if ft.get("home") is None or ft.get("away") is None:
+                continue
+            ht = (m.get("score") or {}).get("halfTime") or {}
+            rows.append((
+                m["id"],
+                m["utcDate"],
+                (m.get("competition") or {}).get("code"),
+                m["homeTeam"]["id"],
+                m["awayTeam"]["id"],
+                ft["home"],
+                ft["away"],
+                ht.get("home"),
+                ht.get("away"),
+            ))
+
+        if not rows:
+            return 0
+
+        with self._write_lock, self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT OR REPLACE INTO matches
+                (id, utc_date, competition, home_id, away_id, home_ft, away_ft, home_ht, away_ht)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            return conn.total_changes - before
+
+    def mark_synced(self, team_id):
+        with self._write_lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO team_sync (team_id, synced_at) VALUES (?, ?)",
+                (team_id, datetime.now().isoformat())
+            )
+
+    def reset_sync(self):
+        """Tüm takımların bir sonraki kullanımda API'den yeniden doldurulmasını sağla"""
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM team_sync")
+
+    def set_meta(self, key, value):
+        with self._write_lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # =====================
+    # OKUMA
+    # =====================
+    def get_meta(self, key, default=None):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def is_synced(self, team_id, max_age_days=None):
+        """Takım bir kez API'den doldurulmuş mu (ve max_age_days içinde mi)?"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT synced_at FROM team_sync WHERE team_id = ?", (team_id,)
+            ).fetchone()
+        if not row:
+            return False
+        if max_age_days is None:
+            return True
+        synced_at = datetime.fromisoformat(row["synced_at"])
+        return datetime.now() - synced_at < timedelta(days=max_age_days)
+
+    @staticmethod
+    def _to_api(r):
+        """Satırı API'nin döndürdüğü maç objesi formatına çevir"""
+        return {
+            "id": r["id"],
+            "utcDate": r["utc_date"],
+            "status": "FINISHED",
+            "competition": {"code": r["competition"]},
+            "homeTeam": {"id": r["home_id"]},
+            "awayTeam": {"id": r["away_id"]},
+            "score": {
+                "fullTime": {"home": r["home_ft"], "away": r["away_ft"]},
+                "halfTime": {"home": r["home_ht"], "away": r["away_ht"]},
+            },
+        }
+
+    def team_matches(self, team_id, before=None, limit=10):
+        """
+        Takımın `before` (ISO tarih/zaman) öncesindeki son `limit` maçı,
+        API'nin döndürdüğü maç objesi formatında (yeniden eskiye).
+        """
+        before = before or "9999"
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT * FROM (
+                    SELECT * FROM matches WHERE home_id = ? AND utc_date < ?
+                    UNION ALL
+                    SELECT * FROM matches WHERE away_id = ? AND utc_date < ?
+                )
+                ORDER BY utc_date DESC
+                LIMIT ?
+            """, (team_id, before, team_id, before, limit)).fetchall()
+
+        return [self._to_api(r) for r in rows]
+
+    def competition_matches(self, code, since):
+        """Bir ligin `since` (ISO tarih) sonrasındaki bitmiş maçları, API formatında"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM matches WHERE competition = ? AND utc_date >= ?",
+                (code, since)
+            ).fetchall()
+        return [self._to_api(r) for r in rows]
+
+    def stats(self):
+        with self._connect() as conn:
+            matches = conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+            teams = conn.execute("SELECT COUNT(*) FROM team_sync").fetchone()[0]
+        return {
+            "matches": matches,
+            "synced_teams": teams,
+            "results_synced_until": self.get_meta("results_synced_until"),
+        }
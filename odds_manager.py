@@ -0,0 +1,248 @@
+"""
+Bahis oranı girişi ve edge hesabı.
+
+Oranlar bir sağlayıcıdan (varsayılan: yerel besleme dosyası) toplu
+yüklenir, normalize edilmiş takım adları + başlama saati indeksiyle
+fikstüre bağlanır ve tüm marketlerin edge'i tek vektörize geçişte
+hesaplanır. Çıktı v5 şemasındadır (bkz. v5_output.json):
+
+    {"league", "match", "market", "model_prob", "odds", "edge", "confidence"}
+"""
+import json
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+# İç market kodu → v5 market adı
+MARKET_NAMES = {
+    "MS1": "MS1",
+    "MS0": "MS0",
+    "MS2": "MS2",
+    "O25": "O2.5",
+    "KG": "BTTS",
+    "FH15": "FH1.5",
+}
+
+# Beslemede karşılaşılan market adları → iç market kodu
+FEED_MARKETS = {
+    **{code: code for code in MARKET_NAMES},
+    **{name: code for code, name in MARKET_NAMES.items()},
+    "1": "MS1", "X": "MS0", "2": "MS2",
+    "HOME": "MS1", "DRAW": "MS0", "AWAY": "MS2",
+    "OVER2.5": "O25", "OVER_2_5": "O25",
+    "GG": "KG",
+    "FH_OVER1.5": "FH15",
+}
+
+# Takım adlarında eşleşmeyi bozan ekler
+NAME_NOISE = {"fc", "afc", "cf", "sc", "ac", "ssc", "cd", "ud", "sd", "rc", "the", "club"}
+
+# Confidence eşikleri (model olasılığı 0-1, edge = p * oran - 1)
+HIGH_PROB = 0.60
+HIGH_EDGE = 0.10
+MEDIUM_EDGE = 0.05
+
+
+def normalize_team(name):
+    """'Leeds United FC' → 'leeds united', 'Atlético Madrid' → 'atletico madrid'"""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(c for c in name if not unicodedata.combining(c)).lower()
+    tokens = [t for t in re.split(r"[^a-z0-9]+", name) if t and t not in NAME_NOISE]
+    return " ".join(tokens)
+
+
+def _parse_kickoff(value):
+    """ISO başlama zamanı → UTC'ye bağlı datetime. Saat dilimsiz değerler UTC kabul edilir."""
+    try:
+        kickoff = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if kickoff.tzinfo is None:
+        kickoff = kickoff.replace(tzinfo=timezone.utc)
+    return kickoff
+
+
+# =====================
+# SAĞLAYICILAR
+# =====================
+class OddsProvider:
+    """
+    Oran sağlayıcı arayüzü. fetch() şu formatta kayıt listesi döndürmelidir:
+
+        {"home": "Leeds", "away": "Norwich", "kickoff": "2026-01-21T19:45:00Z",
+         "odds": {"MS1": 1.80, "O2.5": 1.95, "BTTS": 1.88, ...}}
+    """
+
+    name = "base"
+
+    def fetch(self, date_from, date_to):
+        raise NotImplementedError
+
+
+class FileOddsProvider(OddsProvider):
+    """Yerel JSON besleme dosyası: kayıt listesi veya {"events": [...]}"""
+
+    name = "file"
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def fetch(self, date_from, date_to):
+        if not self.path.exists():
+            print(f"⚠️ Oran dosyası bulunamadı: {self.path}")
+            return []
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        events = data.get("events", []) if isinstance(data, dict) else data
+        return [
+            e for e in events
+            if date_from <= str(e.get("kickoff", ""))[:10] <= date_to
+        ]
+
+
+# =====================
+# EŞLEŞTİRME
+# =====================
+class OddsIndex:
+    """
+    (normalize ev, normalize deplasman) → [(başlama, oranlar)] indeksi.
+    Ad tam tutmazsa aynı gündeki kayıtlarda kelime kümesi kapsaması denenir
+    ('Leeds' ↔ 'Leeds United'). Başlama saati tolerans içinde olmalıdır.
+    """
+
+    def __init__(self, records, tolerance_hours=3):
+        self.tolerance = timedelta(hours=tolerance_hours)
+        self._by_names = {}
+        self._by_day = {}
+        self.size = 0
+
+        for r in records:
+            kickoff = _parse_kickoff(r.get("kickoff"))
+            odds = self._parse_odds(r.get("odds") or {})
+            if kickoff is None or not odds:
+                continue
+
+            home, away = normalize_team(r.get("home")), normalize_team(r.get("away"))
+            self._by_names.setdefault((home, away), []).append((kickoff, odds))
+            self._by_day.setdefault(kickoff.date(), []).append(
+                (set(home.split()), set(away.split()), kickoff, odds)
+            )
+            self.size += 1
+
+    @staticmethod
+    def _parse_odds(raw):
+        odds = {}
+        for key, value in raw.items():
+            code = FEED_MARKETS.get(str(key).upper())
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            if code and value > 1.0:
+                odds[code] = value
+        return odds
+
+    def _close(self, kickoff, candidate):
+        return abs(candidate - kickoff) <= self.tolerance
+
+    def lookup(self, home_names, away_names, kickoff):
+        """home_names/away_names: takımın olası adları (name, shortName...)"""
+        kickoff = _parse_kickoff(kickoff)
+        if kickoff is None:
+            return None
+
+        homes = {normalize_team(n) for n in home_names if n}
+        aways = {normalize_team(n) for n in away_names if n}
+
+        for home in homes:
+            for away in aways:
+                for candidate, odds in self._by_names.get((home, away), []):
+                    if self._close(kickoff, candidate):
+                        return odds
+
+        # Kelime kümesi kapsaması (aynı gün, tolerans içinde)
+        home_sets = [set(h.split()) for h in homes]
+        away_sets = [set(a.split()) for a in aways]
+        covers = lambda a, b: bool(a) and bool(b) and (a <= b or b <= a)
+
+        for day in {kickoff.date(), (kickoff - self.tolerance).date(), (kickoff + self.tolerance).date()}:
+            for feed_home, feed_away, candidate, odds in self._by_day.get(day, []):
+                if not self._close(kickoff, candidate):
+                    continue
+                if any(covers(feed_home, h) for h in home_sets) and any(covers(feed_away, a) for a in away_sets):
+                    return odds
+        return None
+
+
+# =====================
+# EDGE
+# =====================
+def compute_edges(model_probs, odds):
+    """
+    Vektörize edge ve confidence.
+    model_probs: 0-1 olasılıklar, odds: ondalık oranlar (aynı uzunlukta)
+    """
+    p = np.asarray(model_probs, dtype=np.float64)
+    o = np.asarray(odds, dtype=np.float64)
+    edge = p * o - 1
+
+    confidence = np.select(
+        [(p >= HIGH_PROB) & (edge >= HIGH_EDGE), edge >= MEDIUM_EDGE],
+        ["High", "Medium"],
+        default="Low"
+    )
+    return edge, confidence
+
+
+def build_v5(day, grouped, index):
+    """
+    grouped: {lig adı: [maç]} (markets hesaplanmış snapshot maçları)
+    Eşleşen maçlara m["odds"] yazılır. (v5 çıktısı, {(maç adı, market): satır}) döner.
+    Edge, lig ağırlığı uygulanmamış model olasılığından (m["model_probs"]) hesaplanır;
+    m["markets"] ağırlıklı ve 95'te kesilmiş sıralama skorudur, olasılık değildir.
+    """
+    keys, probs, prices = [], [], []
+
+    for league, matches in grouped.items():
+        for m in matches:
+            home, away = m["homeTeam"], m["awayTeam"]
+            odds = index.lookup(
+                (home.get("name"), home.get("shortName")),
+                (away.get("name"), away.get("shortName")),
+                m.get("utcDate")
+            )
+            if not odds:
+                continue
+
+            m["odds"] = odds
+            model_probs = m.get("model_probs") or {}
+            for market, price in odds.items():
+                if market not in model_probs:
+                    continue
+                keys.append((league, m, market))
+                probs.append(model_probs[market] / 100)
+                prices.append(price)
+
+    edge, confidence = compute_edges(probs, prices)
+
+    rows = []
+    by_pick = {}
+    for i, (league, m, market) in enumerate(keys):
+        row = {
+            "league": league,
+            "match": f"{m['homeTeam']['name']} vs {m['awayTeam']['name']}",
+            "market": MARKET_NAMES[market],
+            "model_prob": round(probs[i], 2),
+            "odds": prices[i],
+            "edge": round(float(edge[i]), 2),
+            "confidence": str(confidence[i]),
+        }
+        rows.append(row)
+        by_pick[(f"{m['homeTeam']['name']} - {m['awayTeam']['name']}", market)] = row
+
+    return {"date": day, "matches": rows}, by_pick
@@ -0,0 +1,113 @@
+"""
+Poisson skor matrisi motoru.
+
+Her maç için beklenen goller (λ_ev, λ_dep) get_team_stats çıktısından
+türetilir, tek bir skor olasılık matrisi kurulur ve tüm marketler bu
+matristen okunur. Böylece MS / O2.5 / KG birbiriyle çelişemez.
+
+Matrisler yuvarlanmış (λ_ev, λ_dep) ile memoize edilir; gün içinde tekrar
+eden girdiler ikinci kez hesaplanmaz.
+"""
+import math
+from functools import lru_cache
+
+MAX_GOALS = 10          # matris boyutu (0..10 gol)
+LAMBDA_PRECISION = 2    # memoize anahtarı için yuvarlama
+MIN_LAMBDA = 0.05
+FIRST_HALF_SHARE = 0.45  # gollerin ilk yarıya düşen payı
+
+
+def _poisson_row(lam):
+    row = [math.exp(-lam)]
+    for k in range(1, MAX_GOALS + 1):
+        row.append(row[-1] * lam / k)
+    return row
+
+
+@lru_cache(maxsize=4096)
+def score_matrix(lam_home, lam_away):
+    """P(ev=i, dep=j) matrisi (tuple of tuples), kesilen kuyruk normalize edilir"""
+    home = _poisson_row(lam_home)
+    away = _poisson_row(lam_away)
+    grid = [[h * a for a in away] for h in home]
+    total = sum(sum(row) for row in grid)
+    return tuple(tuple(p / total for p in row) for row in grid)
+
+
+@lru_cache(maxsize=4096)
+def matrix_markets(lam_home, lam_away):
+    """Tam maç matrisinden MS1/MS0/MS2/O25/KG olasılıkları (0-1)"""
+    grid = score_matrix(lam_home, lam_away)
+    ms1 = ms0 = ms2 = over25 = kg = 0.0
+    for i, row in enumerate(grid):
+        for j, p in enumerate(row):
+            if i > j:
+                ms1 += p
+            elif i == j:
+                ms0 += p
+            else:
+                ms2 += p
+            if i + j >= 3:
+                over25 += p
+            if i > 0 and j > 0:
+                kg += p
+    return ms1, ms0, ms2, over25, kg
+
+
+@lru_cache(maxsize=4096)
+def first_half_over15(lam_home, lam_away):
+    """İlk yarı matrisinden P(toplam gol >= 2)"""
+    grid = score_matrix(lam_home, lam_away)
+    under = grid[0][0] + grid[1][0] + grid[0][1]
+    return 1.0 - under
+
+
+def _key(lam):
+    return round(max(MIN_LAMBDA, lam), LAMBDA_PRECISION)
+
+
+def expected_goals(hs, as_):
+    """
+    λ_ev  = (ev sahibinin evdeki gol ort. + deplasmanın dışarıda yediği) / 2
+    λ_dep = (deplasmanın dışarıdaki gol ort. + ev sahibinin evde yediği) / 2
+    Hiç ev / deplasman maçı yoksa genel ortalamaya düşülür.
+    """
+    home_has_home = hs.get("home_rate", 0) > 0
+    away_has_away = as_.get("home_rate", 100) < 100
+
+    home_attack = hs["home_avg_scored"] if home_has_home else hs["avg_scored"]
+    home_defense = hs["home_avg_conceded"] if home_has_home else hs["avg_conceded"]
+    away_attack = as_["away_avg_scored"] if away_has_away else as_["avg_scored"]
+    away_defense = as_["away_avg_conceded"] if away_has_away else as_["avg_conceded"]
+
+    lam_home = (home_attack + away_defense) / 2
+    lam_away = (away_attack + home_defense) / 2
+    return lam_home, lam_away
+
+
+def poisson_markets(hs, as_):
+    """build_markets'in beklediği yüzde formatında marketler (ağırlıksız)"""
+    lam_home, lam_away = expected_goals(hs, as_)
+    lh, la = _key(lam_home), _key(lam_away)
+
+    ms1, ms0, ms2, over25, kg = matrix_markets(lh, la)
+    fh15 = first_half_over15(_key(lh * FIRST_HALF_SHARE), _key(la * FIRST_HALF_SHARE))
+
+    return {
+        "MS1": round(ms1 * 100, 2),
+        "MS0": round(ms0 * 100, 2),
+        "MS2": round(ms2 * 100, 2),
+        "O25": round(over25 * 100, 2),
+        "KG": round(kg * 100, 2),
+        "FH15": round(fh15 * 100, 2),
+    }
+
+
+def cache_stats():
+    info = matrix_markets.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "matrices": score_matrix.cache_info().currsize,
+    }
@@ -0,0 +1,370 @@
+"""
+Tahmin modeli - takım istatistiklerinden market yüzdeleri, tahmin ve kuponlar.
+
+Yan etkisiz: import edilince bağlantı, dosya ya da zamanlayıcı açmaz, global
+durum tutmaz. Takım istatistikleri ve güçleri çağıran taraftan gelir;
+main canlı veriyle (get_team_stats / get_team_strength), backtest arşivle çağırır.
+"""
+import statistics
+
+import batch_engine
+import coupon_optimizer
+import poisson_engine
+from strength_table import strength_from_averages
+from team_form import RollingForm
+
+# =====================
+# LIGLER
+# =====================
+COMPETITIONS = {
+    "Champions League": "CL",
+    "Premier League": "PL",
+    "La Liga": "PD",
+    "Serie A": "SA",
+    "Bundesliga": "BL1",
+    "Ligue 1": "FL1",
+    "Eredivisie": "DED",
+    "Primeira Liga": "PPL",
+    "Championship": "ELC",
+    "Brezilya Serie A": "BSA"
+}
+
+LEAGUE_WEIGHT = {
+    "CL": 1.08,
+    "PL": 1.05,
+    "BL1": 1.04,
+    "SA": 1.04,
+    "PD": 1.03,
+    "FL1": 1.02,
+    "ELC": 1.01,
+    "PPL": 1.00,
+    "DED": 0.98,
+    "BSA": 1.00
+}
+
+
+def compute_team_stats(team_id, data, window=10):
+    """
+    Bitmiş maç listesinden takım istatistiklerini hesapla (I/O yok).
+    get_team_stats ile aynı kayan form hesabını kullanır (backtest için).
+    """
+    return RollingForm(team_id, window).extend(data).to_stats()
+
+def team_strength(table, team_id, stats):
+    """
+    Takım gücü (0-100): güç tablosunda varsa oradan, yoksa (sezon başı,
+    kupa rakibi) verilen form istatistiğinden aynı formülle
+    """
+    strength = table.get(team_id)
+    if strength is not None:
+        return strength
+    return strength_from_averages(stats["avg_scored"], stats["avg_conceded"])
+
+def check_consistency(stats):
+    """
+    ✅ 2. ÖZELLİK: FORM TUTARLILIĞI
+    Standart sapma ile tutarlılığı ölçer
+
+    Örnek:
+    [3, 2, 3, 2, 3] → std_dev = 0.5 → Tutarlı = 1.0
+    [5, 0, 6, 0, 4] → std_dev = 2.8 → Tutarsız = 0.6
+
+    Takım formundaki goals_n / goals_mean / goals_std özetini kullanır;
+    eski cache dosyalarındaki goals_list de desteklenir.
+    """
+    try:
+        if "goals_n" in stats:
+            n = stats["goals_n"]
+            std_dev = stats["goals_std"]
+            mean = stats["goals_mean"]
+        else:
+            goals_list = stats.get("goals_list", [])
+            n = len(goals_list)
+            if n >= 3:
+                std_dev = statistics.stdev(goals_list)
+                mean = statistics.mean(goals_list)
+
+        if n < 3:
+            return 1.0  # Yeterli veri yok, nötr
+
+        # Varyasyon katsayısı (CV)
+        if mean > 0:
+            cv = std_dev / mean
+        else:
+            cv = 0
+
+        # CV düşükse tutarlı, yüksekse tutarsız
+        if cv < 0.3:
+            return 1.15  # Çok tutarlı → +15% güven
+        elif cv < 0.5:
+            return 1.05  # Tutarlı → +5% güven
+        elif cv < 0.8:
+            return 1.0   # Normal
+        elif cv < 1.2:
+            return 0.92  # Tutarsız → -8% güven
+        else:
+            return 0.80  # Çok tutarsız → -20% güven
+    except:
+        return 1.0
+
+def ms_probs(hs, as_, home_strength, away_strength, is_home_match=True):
+    """
+    ✅ 1. ÖZELLİK: Rakip kalite faktörü
+    ✅ 3. ÖZELLİK: Ev/Deplasman formu kullanımı
+    ✅ 2. ÖZELLİK: Form tutarlılığı entegrasyonu
+    """
+
+    # ✅ Ev/Deplasman formu kullan
+    if is_home_match:
+        home_scored = hs["home_avg_scored"]
+        away_scored = as_["away_avg_scored"]
+    else:
+        home_scored = hs["avg_scored"]
+        away_scored = as_["avg_scored"]
+
+    # Temel fark
+    diff = home_scored - away_scored
+
+    # ✅ 1. ÖZELLİK: Rakip kalite kontrolü
+    # Deplasman takımı çok güçlüyse diff'i azalt
+    if away_strength > 75:  # Top 6 seviye (City, Liverpool, Arsenal vb)
+        diff *= 0.3  # %70 azalt
+    elif away_strength > 65:  # Top 10 seviye
+        diff *= 0.5  # %50 azalt
+    elif away_strength > 55:  # Orta üst
+        diff *= 0.7  # %30 azalt
+
+    # Ev sahibi çok zayıfsa
+    if home_strength < 40:
+        diff *= 0.8
+
+    # ✅ 2. ÖZELLİK: Form tutarlılığı uygula
+    home_consistency = check_consistency(hs)
+    away_consistency = check_consistency(as_)
+
+    diff *= home_consistency
+    diff *= (2 - away_consistency)  # Rakip tutarsızsa avantaj
+
+    ms1 = max(18, 50 + diff * 11)
+    ms2 = max(18, 50 - diff * 11)
+    msx = max(12, 100 - (ms1 + ms2))
+
+    t = ms1 + msx + ms2
+
+    return {
+        "MS1": round(ms1 / t * 100, 2),
+        "MS0": round(msx / t * 100, 2),
+        "MS2": round(ms2 / t * 100, 2)
+    }
+
+def over_probs(hs, as_):
+    """
+    ✅ 4. ÖZELLİK: OYUN TARZI UYUMU
+    İki hücum takımı → Over yükselir
+    İki savunma takımı → Under yükselir
+    """
+    base = (hs["over25"] + as_["over25"]) / 2
+
+    # ✅ Oyun tarzı uyumu
+    home_attack = hs["avg_scored"]
+    away_attack = as_["avg_scored"]
+
+    # İki takım da hücum odaklıysa
+    if home_attack > 2.5 and away_attack > 2.5:
+        base *= 1.15  # +15% Over bonusu
+
+    # İki takım da savunma odaklıysa
+    elif home_attack < 1.2 and away_attack < 1.2:
+        base *= 0.80  # -20% Over (Under'a kaydir)
+
+    # Bir takım çok gol atıyor, diğeri çok yiyor
+    home_defense = hs["avg_conceded"]
+    away_defense = as_["avg_conceded"]
+
+    if (home_attack > 2.5 and away_defense > 1.8) or (away_attack > 2.5 and home_defense > 1.8):
+        base *= 1.10  # +10% Over bonusu
+
+    return {"O25": min(round(base, 2), 95)}
+
+def kg_probs(hs, as_):
+    """
+    ✅ 4. ÖZELLİK: OYUN TARZI UYUMU
+    İki hücum takımı → KG yükselir
+    Bir takım çok savunmacıysa → KG düşer
+    """
+    base = (hs["kg"] + as_["kg"]) / 2
+
+    # ✅ Oyun tarzı uyumu
+    home_attack = hs["avg_scored"]
+    away_attack = as_["avg_scored"]
+
+    # İki takım da hücum odaklıysa
+    if home_attack > 2.0 and away_attack > 2.0:
+        base *= 1.12  # +12% KG bonusu
+
+    # Bir takım çok savunmacıysa
+    if home_attack < 1.0 or away_attack < 1.0:
+        base *= 0.85  # -15% KG
+
+    return {"KG": min(round(base, 2), 90)}
+
+def fh_probs(hs, as_):
+    """
+    ✅ Basit ortalama - oyun tarzı etkisi az
+    """
+    o = (hs["fh15"] + as_["fh15"]) / 2
+    return {"FH15": round(o, 2)}
+
+def score_match(hs, as_, home_strength, away_strength, league_code, engine="scalar"):
+    """
+    ✅ Bir maçın tüm marketleri, liga ağırlığıyla
+    ✅ engine="poisson" → marketler tek skor matrisinden okunur
+    (marketler, ağırlıksız model yüzdeleri) döner: ağırlıklı ve 95 tavanlı
+    değerler sadece sıralama içindir, edge hesabı model yüzdeleriyle yapılır.
+    """
+    if engine == "poisson":
+        poisson = poisson_engine.poisson_markets(hs, as_)
+        ms = {k: poisson[k] for k in ("MS1", "MS0", "MS2")}
+        over = {"O25": poisson["O25"]}
+        kg = {"KG": poisson["KG"]}
+        fh = {"FH15": poisson["FH15"]}
+    else:
+        # ✅ Yeni formüllerle hesapla
+        ms = ms_probs(hs, as_, home_strength, away_strength, is_home_match=True)
+        over = over_probs(hs, as_)
+        kg = kg_probs(hs, as_)
+        fh = fh_probs(hs, as_)
+
+    probs = {**ms, **over, **kg, **fh}
+    model_probs = {market: round(value, 2) for market, value in probs.items()}
+
+    # Liga ağırlığı uygula
+    weight = LEAGUE_WEIGHT.get(league_code, 1.0)
+
+    # Tüm piyasaları ağırlıklandır
+    all_markets = {}
+    for market, value in probs.items():
+        weighted_value = min(value * weight, 95)
+        all_markets[market] = round(weighted_value, 2)
+
+    # ✅ En yüksek piyasayı bul
+    best_key, best_value = max(all_markets.items(), key=lambda x: x[1])
+
+    all_markets["best"] = best_key
+    all_markets["best_value"] = best_value
+
+    return all_markets, model_probs
+
+def score_batch(rows):
+    """
+    ✅ Vektörize market hesabı: [(hs, as_, ev_gücü, dep_gücü, lig_kodu), ...]
+    için score_match ile birebir aynı (marketler, model yüzdeleri) listeleri döner.
+    """
+    if not rows:
+        return [], []
+
+    features = {key: [] for key in batch_engine.FEATURES}
+    for hs, as_, home_strength, away_strength, league_code in rows:
+        # ms_probs(is_home_match=True) ile aynı girdiler
+        features["home_scored"].append(hs["home_avg_scored"])
+        features["away_scored"].append(as_["away_avg_scored"])
+        features["home_avg_scored"].append(hs["avg_scored"])
+        features["away_avg_scored"].append(as_["avg_scored"])
+        features["home_avg_conceded"].append(hs["avg_conceded"])
+        features["away_avg_conceded"].append(as_["avg_conceded"])
+        features["home_over25"].append(hs["over25"])
+        features["away_over25"].append(as_["over25"])
+        features["home_kg"].append(hs["kg"])
+        features["away_kg"].append(as_["kg"])
+        features["home_fh15"].append(hs["fh15"])
+        features["away_fh15"].append(as_["fh15"])
+        features["home_strength"].append(home_strength)
+        features["away_strength"].append(away_strength)
+        features["home_consistency"].append(check_consistency(hs))
+        features["away_consistency"].append(check_consistency(as_))
+        features["weight"].append(LEAGUE_WEIGHT.get(league_code, 1.0))
+
+    result = batch_engine.score_batch(features)
+    return batch_engine.to_market_dicts(result), batch_engine.to_model_probs(result)
+
+def pick_from_markets(match, markets):
+    """En yüksek market %65+ ise maçın tahminini döndür"""
+    if markets["best_value"] < 65:
+        return None
+    return {
+        "match": f"{match['homeTeam']['name']} - {match['awayTeam']['name']}",
+        "market": markets["best"],
+        "value": markets["best_value"]
+    }
+
+def coupon_candidates(picks, matches=None, min_leg_prob=65):
+    """
+    Kupon aday ayakları. Maçlar verilirse her maçın %min_leg_prob+
+    tüm marketleri aday olur (oran varsa eklenir), yoksa sadece picks.
+    ✅ Eşik ağırlıklı skorla (value), EV / oran hesabı ağırlıksız model
+    olasılığıyla (prob, m["model_probs"]) yapılır.
+    """
+    if matches is None:
+        return picks
+
+    candidates = []
+    for m in matches:
+        name = f"{m['homeTeam']['name']} - {m['awayTeam']['name']}"
+        odds = m.get("odds") or {}
+        model_probs = m.get("model_probs") or {}
+        for market, value in m["markets"].items():
+            if market in ("best", "best_value") or value < min_leg_prob:
+                continue
+            leg = {"match": name, "market": market, "value": value}
+            if market in model_probs:
+                leg["prob"] = model_probs[market]
+            if market in odds:
+                leg["odds"] = odds[market]
+            candidates.append(leg)
+    return candidates
+
+def generate_coupons(picks, matches=None, mode="optimize", min_leg_prob=65):
+    """
+    ✅ YENİ MANTIK: %65 üstü tahminleri en yüksekten düşüğe sırala
+
+    1️⃣ GÜNÜN KOMBİNESİ: En yüksek 3 tahmin (%65+)
+    2️⃣ YÜKSEK ORAN: Sonraki 4 tahmin (%65+)
+    3️⃣ SÜPER ORAN: Sonraki 5 tahmin (%65+)
+
+    Tüm kuponlar %65+ tahminlerden oluşur ve yüksekten düşüğe sıralanır.
+
+    ✅ mode="optimize": her seviye için birleşik olasılık / beklenen
+    değer, maç başına tek ayak ve hedef toplam oran aralığı gözetilerek
+    maç grupları üzerinde dinamik programlamayla seçilir; aralıkta kombinasyon
+    yoksa her maçın en iyi ayağından en iyileri alınır (coupon_optimizer).
+    """
+    if not picks:
+        return {
+            "daily": [],
+            "high_odds": [],
+            "super_odds": []
+        }
+
+    if mode == "optimize":
+        return coupon_optimizer.optimize_coupons(
+            coupon_candidates(picks, matches, min_leg_prob), min_leg_prob=min_leg_prob
+        )
+
+    # %65 ve üstü tahminleri filtrele ve en yüksekten düşüğe sırala
+    filtered_picks = [p for p in picks if p['value'] >= 65]
+    sorted_picks = sorted(filtered_picks, key=lambda x: x['value'], reverse=True)
+
+    # 1️⃣ GÜNÜN KOMBİNESİ: İlk 3 tahmin (en yüksek değerliler)
+    daily_coupon = sorted_picks[:3]
+
+    # 2️⃣ YÜKSEK ORAN: Sonraki 4 tahmin
+    high_odds_coupon = sorted_picks[3:7]
+
+    # 3️⃣ SÜPER ORAN: Sonraki 5 tahmin
+    super_odds_coupon = sorted_picks[7:12]
+
+    return {
+        "daily": daily_coupon,
+        "high_odds": high_odds_coupon,
+        "super_odds": super_odds_coupon
+    }
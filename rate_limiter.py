@@ -0,0 +1,106 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Process genelinde paylaşılan token-bucket rate limiter.
+
+    - Plan limiti (dakikalık istek) kadar token tutar, token'lar sürekli dolar
+    - acquire() çağrısı sıradaki boş slotu ayırır ve o ana kadar bekler,
+      böylece istekler 429 almadan önceden planlanır
+    - update_from_headers() football-data.org'un kalan kota / reset
+      header'larını okuyup bucket'ı sunucuyla hizalar
+    """
+
+    def __init__(self, requests_per_minute=10):
+        self.requests_per_minute = max(1, int(requests_per_minute))
+        self.capacity = float(self.requests_per_minute)
+        self.rate = self.requests_per_minute / 60.0  # saniyede dolan token
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+        self.total_calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled_calls = 0
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self):
+        """Bir istek hakkı ayır, gerekirse bekle. Beklenen süreyi (sn) döner."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            # Token'ı şimdiden düş - negatife inerse slot ileri bir zamana planlanır
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+            # Sunucu kotanın bittiğini söylediyse reset zamanına kadar bekle
+            if self._blocked_until > now:
+                wait = max(wait, self._blocked_until - now)
+
+            self.total_calls += 1
+            if wait > 0:
+                self.throttled_calls += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def update_from_headers(self, headers):
+        """
+        Response header'larından kalan kota ve reset süresini oku.
+
+        football-data.org:
+            X-Requests-Available-Minute → bu dakika kalan istek
+            X-RequestCounter-Reset      → sayacın sıfırlanmasına kalan saniye
+        """
+        if not headers:
+            return
+
+        try:
+            available = headers.get("X-Requests-Available-Minute")
+            reset = headers.get("X-RequestCounter-Reset")
+            available = int(available) if available is not None else None
+            reset = float(reset) if reset is not None else None
+        except (TypeError, ValueError):
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if available is not None:
+                # Sunucu bizden az token görüyorsa ona uy
+                self._tokens = min(self._tokens, float(available))
+
+                if available <= 0 and reset is not None:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+
+    def block_for(self, seconds):
+        """429 gibi durumlarda tüm istekleri verilen süre kadar durdur"""
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests_per_minute": self.requests_per_minute,
+                "total_calls": self.total_calls,
+                "throttled_calls": self.throttled_calls,
+                "total_wait_seconds": round(self.total_wait, 2),
+                "max_wait_seconds": round(self.max_wait, 2),
+            }
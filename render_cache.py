@@ -0,0 +1,94 @@
+import hashlib
+import threading
+from pathlib import Path
+
+# Sayfa çıktısını belirleyen kitleler
+AUDIENCES = ("anon", "free", "premium")
+
+# Önbellekteki gövdede kullanıcıya özel menünün yeri
+USER_MENU_SLOT = "<!--user-menu-->"
+
+
+def templates_fingerprint(directory="templates"):
+    """Template dosyalarının içerik özeti: deploy'da değişir, worker'lar arasında aynıdır"""
+    digest = hashlib.sha1()
+    for file in sorted(Path(directory).glob("*.html")):
+        digest.update(file.name.encode())
+        digest.update(file.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def make_etag(*parts):
+    """Sayfayı belirleyen parçalardan (sayfa, snapshot sürümü, kitle...) güçlü ETag"""
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest()[:24] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match başlığı (virgüllü liste, W/ öneki, *) ETag'i kapsıyor mu"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def audience_of(user):
+    """verify_session sonucundan kitle: anon / free / premium"""
+    if not user:
+        return "anon"
+    return "premium" if user["is_premium"] else "free"
+
+
+class RenderCache:
+    """
+    Render edilmiş sayfa gövdeleri: (sayfa, kitle) → (snapshot sürümü, html).
+
+    - Gövde sadece snapshot'a ve kitleye bağlıdır, Jinja render'ı sürüm başına
+      kitle başına bir kez yapılır
+    - Kullanıcıya özel menü gövdede USER_MENU_SLOT olarak kalır, her istekte
+      fill() ile ayrıca doldurulur
+    - Yeni snapshot kaydedilince sürüm değişir, eski gövde ilk istekte yenisiyle
+      değiştirilir (ayrıca temizleme gerekmez)
+    """
+
+    def __init__(self):
+        self._pages = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.renders = 0
+
+    def get_or_render(self, page, version, audience, render):
+        """render(): gövdeyi üreten fonksiyon. version None ise önbelleğe alınmaz."""
+        key = (page, audience)
+        if version is not None:
+            with self._lock:
+                item = self._pages.get(key)
+                if item is not None and item[0] == version:
+                    self.hits += 1
+                    return item[1]
+
+        body = render()
+        with self._lock:
+            self.renders += 1
+            if version is not None:
+                self._pages[key] = (version, body)
+        return body
+
+    @staticmethod
+    def fill(body, user_menu=""):
+        return body.replace(USER_MENU_SLOT, user_menu, 1)
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pages": len(self._pages),
+                "hits": self.hits,
+                "renders": self.renders,
+            }
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+# Endpoint bazlı TTL (saniye) - ilk eşleşen kural geçerli
+DEFAULT_TTL_RULES = [
+    (r"/teams/\d+/matches$", 12 * 60 * 60),         # takım geçmişi günde en fazla 1 kez değişir
+    (r"/competitions/[^/]+/standings$", 6 * 60 * 60),
+    (r"/competitions/[^/]+/matches$", 10 * 60),     # günün fikstürü / skorlar
+    (r"/matches$", 10 * 60),
+]
+
+
+class ResponseCache:
+    """
+    Football API ham cevapları için disk cache'i (cache_data/http/).
+
+    - Anahtar: URL + sıralı parametreler
+    - Endpoint bazlı TTL; süresi dolan kayıt ETag / Last-Modified varsa
+      koşullu istekle (If-None-Match / If-Modified-Since) doğrulanır
+    - Taze kayıtlar rate limit bütçesi harcamadan servis edilir
+    """
+
+    def __init__(self, cache_dir="cache_data/http", ttl_rules=None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_rules = [(re.compile(p), ttl) for p, ttl in (ttl_rules or DEFAULT_TTL_RULES)]
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stores = 0
+
+    def ttl_for(self, url):
+        path = urlsplit(url).path
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(path):
+                return ttl
+        return 0
+
+    def _key(self, url, params):
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        raw = url + "?" + "&".join(f"{k}={v}" for k, v in items)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _file(self, url, params):
+        return self.cache_dir / f"{self._key(url, params)}.json"
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, url, params=None):
+        """Kaydı döner (taze veya bayat). Cache'lenmeyen endpoint için None."""
+        if self.ttl_for(url) <= 0:
+            return None
+
+        file = self._file(url, params)
+        if not file.exists():
+            return None
+
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def is_fresh(self, entry, url):
+        return time.time() - entry.get("stored_at", 0) < self.ttl_for(url)
+
+    def hit(self):
+        self._count("hits")
+
+    def miss(self):
+        self._count("misses")
+
+    def conditional_headers(self, entry):
+        """Bayat kayıt için koşullu istek header'ları"""
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _write(self, file, entry):
+        tmp = file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, file)
+
+    def store(self, url, params, body, headers=None):
+        if self.ttl_for(url) <= 0:
+            return
+
+        headers = headers or {}
+        entry = {
+            "url": url,
+            "params": params or {},
+            "stored_at": time.time(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "body": body,
+        }
+        try:
+            self._write(self._file(url, params), entry)
+            self._count("stores")
+        except Exception as e:
+            print(f"⚠️ HTTP cache yazılamadı: {e}")
+
+    def refresh(self, url, params, entry, headers=None):
+        """304 Not Modified sonrası kaydın süresini yenile"""
+        headers = headers or {}
+        entry["stored_at"] = time.time()
+        entry["etag"] = headers.get("ETag") or entry.get("etag")
+        entry["last_modified"] = headers.get("Last-Modified") or entry.get("last_modified")
+        try:
+            self._write(self._file(url, params), entry)
+        except Exception as e:
+            print(f"⚠️ HTTP cache güncellenemedi: {e}")
+        self._count("revalidated")
+        return entry["body"]
+
+    def cleanup(self, max_age=None):
+        """En uzun TTL'den eski kayıtları sil"""
+        max_age = max_age or max((ttl for _, ttl in self.ttl_rules), default=0) * 2
+        now = time.time()
+        removed = 0
+        for f in self.cache_dir.glob("*.json"):
+            try:
+                if now - f.stat().st_mtime > max_age:
+                    f.unlink()
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "stores": self.stores,
+                "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+            }
@@ -0,0 +1,132 @@
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+
+class PipelineScheduler:
+    """
+    Günlük maç/tahmin/kupon pipeline'ını arka planda çalıştıran zamanlayıcı.
+
+    - Her gün belirli saatte (TR saati, örn. 00:05) çalışır
+    - Sonrasında belirli aralıklarla (örn. 180 dk) tekrar çalışır
+    - trigger() ile istek beklemeden hemen çalıştırılabilir
+    - Aynı anda sadece tek çalıştırma olur; bu sırada handler'lar son
+      sağlam snapshot'ı servis etmeye devam eder
+    - job(reason) şeklinde çağrılır (reason: "zamanlanmış", "refresh" ...)
+    """
+
+    def __init__(self, job, tz, daily_at="00:05", interval_minutes=180):
+        self.job = job
+        self.tz = tz
+        hour, minute = (int(x) for x in daily_at.split(":"))
+        self.daily_at = (hour, minute)
+        self.interval = timedelta(minutes=interval_minutes) if interval_minutes > 0 else None
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._pending_reason = None
+
+        self.last_run = None
+        self.last_success = None
+        self.last_error = None
+        self.last_duration = None
+        self.next_run = None
+        self.run_count = 0
+
+    @property
+    def is_running(self):
+        return self._run_lock.locked()
+
+    def _now(self):
+        return datetime.now(self.tz)
+
+    def _next_daily(self, now):
+        hour, minute = self.daily_at
+        candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if candidate <= now:
+            candidate += timedelta(days=1)
+        return candidate
+
+    def _compute_next(self, now):
+        candidates = [self._next_daily(now)]
+        if self.interval:
+            base = self.last_run or now
+            candidates.append(max(base + self.interval, now))
+        return min(candidates)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="pipeline-scheduler", daemon=True)
+        self._thread.start()
+        print(f"⏰ Zamanlayıcı başladı - günlük {self.daily_at[0]:02d}:{self.daily_at[1]:02d} (TR)"
+              f"{', her ' + str(int(self.interval.total_seconds() // 60)) + ' dk' if self.interval else ''}")
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        print("⏰ Zamanlayıcı durduruldu")
+
+    def trigger(self, reason="manual"):
+        """Arka planda hemen bir çalıştırma iste. Zaten çalışıyorsa False döner."""
+        if self.is_running:
+            return False
+        self._pending_reason = reason
+        self._wake.set()
+        return True
+
+    def run_now(self, reason="manual"):
+        """Çalıştırmayı bulunduğu thread'de yap (çalışan varsa atla)"""
+        if not self._run_lock.acquire(blocking=False):
+            print(f"⏭️ Pipeline zaten çalışıyor, atlandı ({reason})")
+            return False
+
+        started = self._now()
+        try:
+            print(f"⏰ Pipeline çalışıyor ({reason}) - {started.strftime('%d.%m.%Y %H:%M')}")
+            self.job(reason)
+            self.last_success = self._now()
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Pipeline hatası ({reason}): {e}")
+            traceback.print_exc()
+            return False
+        finally:
+            self.last_run = started
+            self.last_duration = (self._now() - started).total_seconds()
+            self.run_count += 1
+            self._run_lock.release()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now = self._now()
+            self.next_run = self._compute_next(now)
+            timeout = max(0.0, (self.next_run - now).total_seconds())
+
+            triggered = self._wake.wait(timeout)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            reason = self._pending_reason if triggered and self._pending_reason else "zamanlanmış"
+            self._pending_reason = None
+            self.run_now(reason)
+
+    def status(self):
+        fmt = lambda d: d.isoformat() if d else None
+        return {
+            "running": self.is_running,
+            "run_count": self.run_count,
+            "last_run": fmt(self.last_run),
+            "last_success": fmt(self.last_success),
+            "last_error": self.last_error,
+            "last_duration_seconds": round(self.last_duration, 1) if self.last_duration else None,
+            "next_run": fmt(self.next_run),
+        }
@@ -1,5 +1,5 @@
 import os
-import requests
+from http_client import http_client
 
 # Resend API ayarları
 RESEND_API_KEY = os.getenv("RESEND_API_KEY")
@@ -36,7 +36,7 @@ def send_email(to: str, subject: str, body: str, html: bool = True) -> bool:
         else:
             payload["text"] = body
         
-        response = requests.post(
+        response = http_client.post(
             "https://api.resend.com/emails",
             headers={
                 "Authorization": f"Bearer {RESEND_API_KEY}",
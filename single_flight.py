@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows (lokal geliştirme) - süreçler arası kilit yok
+    fcntl = None
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.started = time.time()
+
+
+class SingleFlight:
+    """
+    Aynı anahtar için eşzamanlı çağrılardan sadece biri çalışır.
+
+    İlk çağrı işi arka plan thread'inde başlatır; sonradan gelenler aynı
+    işe katılır. Herkes (ilk çağıran dahil) sonucu en fazla `timeout`
+    saniye bekler, süre dolarsa TimeoutError alır - iş arka planda devam eder.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def _run(self, key, call, fn):
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def do(self, key, fn, timeout=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if leader:
+            threading.Thread(
+                target=self._run, args=(key, call, fn),
+                name=f"single-flight-{key}", daemon=True
+            ).start()
+
+        if not call.done.wait(timeout):
+            raise TimeoutError(f"{key} hâlâ hazırlanıyor")
+        if call.error:
+            raise call.error
+        return call.result
+
+
+class FileLock:
+    """
+    Süreçler arası (çoklu uvicorn worker) özel kilit - fcntl.flock tabanlı.
+    fcntl yoksa (Windows) sadece süreç içi kilit gibi davranır.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._fd = None
+        self._local = threading.Lock()
+
+    def acquire(self, blocking=True, timeout=None):
+        if not self._local.acquire(blocking, -1 if timeout is None or not blocking else timeout):
+            return False
+
+        if fcntl is None:
+            return True
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._fd = fd
+                return True
+            except BlockingIOError:
+                if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                    os.close(fd)
+                    self._local.release()
+                    return False
+                time.sleep(0.2)
+
+    def release(self):
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._local.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+
+def strength_from_averages(avg_scored, avg_conceded):
+    """Güç = Atak + Savunma dengesi (0-100)"""
+    attack_power = avg_scored * 25
+    defense_power = (3 - avg_conceded) * 25
+    return max(0, min(100, attack_power + defense_power))
+
+
+class StrengthTable:
+    """
+    Lig bazlı takım gücü tablosu (0-100), günde bir kez kurulur.
+
+    - Kaynak: /competitions/{code}/standings (lig başına tek istek) veya
+      puan durumu alınamazsa yerel maç deposundaki sezon maçları
+    - Takım birden fazla tabloda varsa en çok maç oynadığı tablo kullanılır
+      (örn. CL takımı için iç lig)
+    - get() O(1) sözlük okumasıdır, hiçbir zaman istek atmaz
+    """
+
+    def __init__(self, min_games=3):
+        self.min_games = min_games
+        self.built_for = None  # tablonun kurulduğu gün (ISO)
+        self._tables = {}      # lig kodu → {"source": ..., "teams": {team_id: {...}}}
+        self._index = {}       # team_id → (güç, lig kodu, oynanan maç)
+        self._lock = threading.Lock()
+
+    # =====================
+    # KURMA
+    # =====================
+    def set_table(self, code, rows, source):
+        """rows: {team_id: (oynanan, attığı, yediği)}. Tabloya alınan takım sayısını döner."""
+        teams = {}
+        for tid, (played, goals_for, goals_against) in rows.items():
+            if played < self.min_games:
+                continue
+            teams[tid] = {
+                "strength": strength_from_averages(goals_for / played, goals_against / played),
+                "played": played,
+            }
+
+        with self._lock:
+            self._tables[code] = {"source": source, "teams": teams}
+            self._rebuild_index()
+        return len(teams)
+
+    def load_standings(self, code, data):
+        """football-data puan durumu cevabından tablo kur (TOTAL tabloları, gruplar dahil)"""
+        rows = {}
+        for standing in (data or {}).get("standings", []):
+            if standing.get("type") != "TOTAL":
+                continue
+            for row in standing.get("table", []):
+                tid = row["team"]["id"]
+                played = row.get("playedGames") or 0
+                if played > rows.get(tid, (0,))[0]:
+                    rows[tid] = (played, row.get("goalsFor", 0), row.get("goalsAgainst", 0))
+
+        if not rows:
+            return 0
+        return self.set_table(code, rows, "standings")
+
+    def load_history(self, code, matches):
+        """Bitmiş maç listesinden (API formatı) lig tablosu kur"""
+        rows = {}
+        for m in matches:
+            ft = m["score"]["fullTime"]
+            if ft["home"] is None:
+                continue
+            for tid, scored, conceded in (
+                (m["homeTeam"]["id"], ft["home"], ft["away"]),
+                (m["awayTeam"]["id"], ft["away"], ft["home"]),
+            ):
+                played, goals_for, goals_against = rows.get(tid, (0, 0, 0))
+                rows[tid] = (played + 1, goals_for + scored, goals_against + conceded)
+
+        if not rows:
+            return 0
+        return self.set_table(code, rows, "history")
+
+    def _rebuild_index(self):
+        index = {}
+        for code, table in self._tables.items():
+            for tid, team in table["teams"].items():
+                if tid not in index or team["played"] > index[tid][2]:
+                    index[tid] = (team["strength"], code, team["played"])
+        self._index = index
+
+    def clear(self):
+        with self._lock:
+            self._tables = {}
+            self._index = {}
+            self.built_for = None
+
+    # =====================
+    # OKUMA
+    # =====================
+    def get(self, team_id, default=None):
+        item = self._index.get(team_id)
+        return item[0] if item else default
+
+    def table(self, code):
+        """Bir ligin tablosu: [{team_id, strength, played}] güce göre sıralı"""
+        with self._lock:
+            teams = (self._tables.get(code) or {}).get("teams", {})
+            return sorted(
+                ({"team_id": tid, **team} for tid, team in teams.items()),
+                key=lambda t: t["strength"], reverse=True
+            )
+
+    def __len__(self):
+        return len(self._index)
+
+    # =====================
+    # KALICILIK
+    # =====================
+    def save(self, path):
+        with self._lock:
+            data = {
+                "built_for": self.built_for,
+                "min_games": self.min_games,
+                "tables": {
+                    code: {"source": t["source"], "teams": {str(tid): v for tid, v in t["teams"].items()}}
+                    for code, t in self._tables.items()
+                },
+            }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def load(self, path):
+        """Kaydedilmiş tabloyu oku. Kurulduğu günü döner (okunamazsa None)."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Güç tablosu dosyası okunamadı: {e}")
+            return None
+
+        with self._lock:
+            self._tables = {
+                code: {"source": t["source"], "teams": {int(tid): v for tid, v in t["teams"].items()}}
+                for code, t in data.get("tables", {}).items()
+            }
+            self.built_for = data.get("built_for")
+            self._rebuild_index()
+        return self.built_for
+
+    def stats(self):
+        with self._lock:
+            return {
+                "built_for": self.built_for,
+                "teams": len(self._index),
+                "leagues": {code: {"source": t["source"], "teams": len(t["teams"])}
+                            for code, t in self._tables.items()},
+            }
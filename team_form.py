@@ -0,0 +1,241 @@
+import json
+import math
+import os
+import threading
+from collections import deque
+from pathlib import Path
+
+from team_stats import TeamStats
+
+
+class RollingForm:
+    """
+    Bir takımın son `window` bitmiş maçı üzerinden kayan form özeti.
+
+    - Yeni maç eklendiğinde en eski maç pencereden düşer, tüm toplamlar O(1) güncellenir
+    - Atılan gol varyansı tamsayı toplam / kareler toplamı ile akış halinde tutulur,
+      check_consistency ham gol listesine ihtiyaç duymaz
+    - Pencerede sadece kompakt kayıtlar tutulur: (maç id, tarih, evde mi, attığı, yediği, İY 1.5 üst)
+    """
+
+    def __init__(self, team_id, window=10):
+        self.team_id = team_id
+        self.window = window
+        self.entries = deque()
+
+        self.g_for = self.g_against = 0
+        self.over25 = self.kg = self.fh15 = 0
+        self.home_count = 0
+        self.home_scored = self.home_conceded = 0
+        self.away_scored = self.away_conceded = 0
+        self.goals_sum = self.goals_sumsq = 0
+
+    # =====================
+    # GÜNCELLEME
+    # =====================
+    def _entry(self, match):
+        ft = match["score"]["fullTime"]
+        if ft["home"] is None:
+            return None
+        ht = match["score"].get("halfTime") or {}
+
+        is_home = match["homeTeam"]["id"] == self.team_id
+        tg = ft["home"] if is_home else ft["away"]
+        og = ft["away"] if is_home else ft["home"]
+        fh15 = ht.get("home") is not None and (ht["home"] + ht["away"]) >= 2
+        return (match["id"], match["utcDate"], is_home, tg, og, fh15)
+
+    def _apply(self, entry, sign):
+        _, _, is_home, tg, og, fh15 = entry
+
+        self.g_for += sign * tg
+        self.g_against += sign * og
+        self.goals_sum += sign * tg
+        self.goals_sumsq += sign * tg * tg
+
+        if is_home:
+            self.home_count += sign
+            self.home_scored += sign * tg
+            self.home_conceded += sign * og
+        else:
+            self.away_scored += sign * tg
+            self.away_conceded += sign * og
+
+        if tg + og >= 3:
+            self.over25 += sign
+        if tg > 0 and og > 0:
+            self.kg += sign
+        if fh15:
+            self.fh15 += sign
+
+    def push_entry(self, entry):
+        """Kompakt kaydı pencereye ekle. Eklendiyse True."""
+        if self.entries:
+            if entry[1] < self.entries[-1][1]:
+                return False  # pencerenin en yenisinden eski → sıra bozulmasın
+            if any(e[0] == entry[0] for e in self.entries):
+                return False
+
+        self.entries.append(entry)
+        self._apply(entry, 1)
+
+        if len(self.entries) > self.window:
+            self._apply(self.entries.popleft(), -1)
+        return True
+
+    def push(self, match):
+        """Bitmiş bir API maç objesini ekle. Pencere değiştiyse True."""
+        entry = self._entry(match)
+        if entry is None:
+            return False
+        return self.push_entry(entry)
+
+    def extend(self, matches):
+        """Maç listesini tarih sırasıyla ekle (API sırasından bağımsız)"""
+        for m in sorted(matches, key=lambda m: m.get("utcDate", "")):
+            self.push(m)
+        return self
+
+    # =====================
+    # OKUMA
+    # =====================
+    def goals_std(self):
+        n = len(self.entries)
+        if n < 2:
+            return 0.0
+        return math.sqrt((n * self.goals_sumsq - self.goals_sum ** 2) / (n * (n - 1)))
+
+    def to_stats(self):
+        """get_team_stats ile aynı alanlara sahip TeamStats kaydı"""
+        n = len(self.entries)
+        total = n or 1
+        away_count = n - self.home_count
+
+        return TeamStats(
+            avg_scored=self.g_for / total,
+            avg_conceded=self.g_against / total,
+            over25=self.over25 / total * 100,
+            kg=self.kg / total * 100,
+            fh15=self.fh15 / total * 100,
+            home_rate=self.home_count / total * 100,
+
+            home_avg_scored=self.home_scored / max(self.home_count, 1),
+            home_avg_conceded=self.home_conceded / max(self.home_count, 1),
+            away_avg_scored=self.away_scored / max(away_count, 1),
+            away_avg_conceded=self.away_conceded / max(away_count, 1),
+
+            # Form tutarlılığı için gol listesi yerine akış halinde özet
+            goals_mean=self.goals_sum / total,
+            goals_std=self.goals_std(),
+            goals_n=n,
+        )
+
+    def fingerprint(self):
+        """
+        Pencerenin kimliği: [en yeni maç id, maç sayısı]. Pencereye yeni sonuç
+        girdiğinde (veya takım yeniden seed edildiğinde) değişir.
+        """
+        if not self.entries:
+            return None
+        return [self.entries[-1][0], len(self.entries)]
+
+    def to_json(self):
+        return [list(e) for e in self.entries]
+
+    @classmethod
+    def from_json(cls, team_id, entries, window=10):
+        form = cls(team_id, window)
+        for e in entries:
+            form.push_entry(tuple(e))
+        return form
+
+
+class TeamFormStore:
+    """
+    Takım bazlı RollingForm'ların süreç içi deposu.
+
+    - Takım ilk kez görüldüğünde maç geçmişiyle bir kez doldurulur (seed)
+    - Sonrasında her yeni sonuç push_matches ile ilgili iki takıma O(1) eklenir
+    - cache_data/state/team_form.json'a atomik olarak kaydedilir, restart'ta okunur
+    """
+
+    def __init__(self, path="cache_data/state/team_form.json", window=10):
+        self.path = Path(path)
+        self.window = window
+        self._forms = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def get(self, team_id):
+        with self._lock:
+            return self._forms.get(team_id)
+
+    def fingerprint(self, team_id):
+        """Takımın form penceresinin kimliği (RollingForm.fingerprint), form yoksa None"""
+        with self._lock:
+            form = self._forms.get(team_id)
+            return form.fingerprint() if form is not None else None
+
+    def seed(self, team_id, matches):
+        """Takımın formunu verilen maç listesinden baştan kur"""
+        form = RollingForm(team_id, self.window).extend(matches)
+        with self._lock:
+            self._forms[team_id] = form
+        return form
+
+    def push_matches(self, matches):
+        """
+        Yeni bitmiş maçları takip edilen takımların formuna ekle.
+        Formu değişen takım id'lerini döner. Henüz seed edilmemiş
+        takımlar atlanır (eksik pencere oluşmasın).
+        """
+        changed = set()
+        with self._lock:
+            for m in sorted(matches, key=lambda m: m.get("utcDate", "")):
+                for tid in (m["homeTeam"]["id"], m["awayTeam"]["id"]):
+                    form = self._forms.get(tid)
+                    if form is not None and form.push(m):
+                        changed.add(tid)
+        return changed
+
+    def __len__(self):
+        with self._lock:
+            return len(self._forms)
+
+    # =====================
+    # KALICILIK
+    # =====================
+    def save(self):
+        with self._lock:
+            data = {
+                "window": self.window,
+                "teams": {str(tid): f.to_json() for tid, f in self._forms.items()},
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Takım formu dosyası okunamadı: {e}")
+            return
+
+        if data.get("window") != self.window:
+            return  # pencere boyu değişmiş → takımlar yeniden seed edilir
+
+        with self._lock:
+            self._forms = {
+                int(tid): RollingForm.from_json(int(tid), entries, self.window)
+                for tid, entries in data.get("teams", {}).items()
+            }
+
+    def stats(self):
+        with self._lock:
+            return {"teams": len(self._forms), "window": self.window}
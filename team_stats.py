@@ -0,0 +1,149 @@
+import math
+import statistics
+import struct
+
+
+class TeamStats:
+    """
+    Takım form istatistiklerinin kompakt kaydı (__slots__, dict yok).
+
+    get_team_stats'ın eski dict çıktısıyla aynı anahtarlarla okunabilir
+    (stats["avg_scored"], "goals_n" in stats, stats.get(...)), böylece
+    ms_probs / over_probs / batch motoru değişmeden çalışır.
+    """
+
+    FIELDS = (
+        "avg_scored", "avg_conceded",
+        "over25", "kg", "fh15", "home_rate",
+        "home_avg_scored", "home_avg_conceded",
+        "away_avg_scored", "away_avg_conceded",
+        "goals_mean", "goals_std",
+        "goals_n",
+    )
+    __slots__ = FIELDS
+
+    # Binary kayıt: team_id (int32) + 12 float64 + goals_n (uint16)
+    RECORD = struct.Struct("<i12dH")
+
+    def __init__(self, avg_scored=0.0, avg_conceded=0.0, over25=0.0, kg=0.0, fh15=0.0,
+                 home_rate=0.0, home_avg_scored=0.0, home_avg_conceded=0.0,
+                 away_avg_scored=0.0, away_avg_conceded=0.0,
+                 goals_mean=0.0, goals_std=0.0, goals_n=0):
+        self.avg_scored = avg_scored
+        self.avg_conceded = avg_conceded
+        self.over25 = over25
+        self.kg = kg
+        self.fh15 = fh15
+        self.home_rate = home_rate
+        self.home_avg_scored = home_avg_scored
+        self.home_avg_conceded = home_avg_conceded
+        self.away_avg_scored = away_avg_scored
+        self.away_avg_conceded = away_avg_conceded
+        self.goals_mean = goals_mean
+        self.goals_std = goals_std
+        self.goals_n = goals_n
+
+    @classmethod
+    def from_mapping(cls, data):
+        """dict (eski JSON cache, backtest arşivi) veya TeamStats'tan kayıt oluştur"""
+        if isinstance(data, cls):
+            return data
+
+        values = {k: data[k] for k in cls.FIELDS if k in data}
+        if "goals_n" not in data and "goals_list" in data:
+            # Eski format: ham gol listesinden özet
+            goals = data["goals_list"]
+            values["goals_n"] = len(goals)
+            values["goals_mean"] = statistics.mean(goals) if goals else 0.0
+            values["goals_std"] = statistics.stdev(goals) if len(goals) >= 2 else 0.0
+        return cls(**values)
+
+    # =====================
+    # DICT UYUMLULUĞU
+    # =====================
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.FIELDS}
+
+    def __eq__(self, other):
+        if not isinstance(other, TeamStats):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.FIELDS)
+
+    def __repr__(self):
+        return f"TeamStats(avg_scored={self.avg_scored:.2f}, avg_conceded={self.avg_conceded:.2f}, n={self.goals_n})"
+
+    # =====================
+    # BINARY
+    # =====================
+    def pack(self, team_id):
+        return self.RECORD.pack(
+            team_id,
+            self.avg_scored, self.avg_conceded,
+            self.over25, self.kg, self.fh15, self.home_rate,
+            self.home_avg_scored, self.home_avg_conceded,
+            self.away_avg_scored, self.away_avg_conceded,
+            self.goals_mean, self.goals_std,
+            self.goals_n,
+        )
+
+
+# Dosya başlığı: sihirli bayt + format sürümü + kayıt sayısı
+# v2: kayıtların ardından takım başına bitiş zamanı (float64 epoch, NaN = süresiz)
+MAGIC = b"TSTB"
+VERSION = 2
+HEADER = struct.Struct("<4sHI")
+EXPIRY = struct.Struct("<d")
+
+
+def dumps_teams(teams, expires=None):
+    """{team_id: TeamStats | dict} (+ ops. {team_id: bitiş epoch}) → bytes"""
+    expires = expires or {}
+    records = [TeamStats.from_mapping(stats).pack(int(tid)) for tid, stats in teams.items()]
+    expiries = [
+        EXPIRY.pack(math.nan if expires.get(tid) is None else expires[tid])
+        for tid in teams
+    ]
+    return HEADER.pack(MAGIC, VERSION, len(records)) + b"".join(records) + b"".join(expiries)
+
+
+def loads_teams(data, with_expiry=False):
+    """
+    bytes → {team_id (int): TeamStats}. Başlık uyuşmazsa ValueError.
+    with_expiry=True → {team_id: (TeamStats, bitiş epoch | None)}; v1 dosyalarda bitiş None.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Takım cache dosyası çok kısa")
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"Bilinmeyen takım cache formatı: {magic!r} v{version}")
+
+    records_size = count * TeamStats.RECORD.size
+    expiry_size = count * EXPIRY.size if version >= 2 else 0
+    body = memoryview(data)[HEADER.size:]
+    if len(body) != records_size + expiry_size:
+        raise ValueError("Takım cache dosyası eksik veya bozuk")
+
+    if version >= 2:
+        expiries = [None if math.isnan(e) else e for (e,) in EXPIRY.iter_unpack(body[records_size:])]
+    else:
+        expiries = [None] * count
+
+    teams = {}
+    for (team_id, *values), expires in zip(TeamStats.RECORD.iter_unpack(body[:records_size]), expiries):
+        stats = TeamStats(*values)
+        teams[team_id] = (stats, expires) if with_expiry else stats
+    return teams
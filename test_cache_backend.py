@@ -0,0 +1,313 @@
+"""
+RedisBackend / RedisClient testleri: gerçek Redis gerekmez, süreç içinde
+RESP konuşan küçük bir sunucu (StandInRedis) açılır.
+
+Çalıştırma:
+    python -m unittest test_cache_backend
+"""
+import fnmatch
+import io
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+
+from cache_backend import RedisBackend, RedisClient, RedisError, RedisLock
+from cache_manager import CacheManager
+
+
+# =====================
+# RESP SUNUCUSU (test için)
+# =====================
+class StandInRedis(socketserver.ThreadingTCPServer):
+    """
+    RedisBackend'in kullandığı komutların küçük bir alt kümesi:
+    PING, AUTH, SELECT, GET, MGET, SET [NX] [PX], DEL, SCAN, MULTI/EXEC ve
+    RedisLock'un bırakma script'i için EVAL.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.data = {}  # key → (değer, bitiş monotonic | None)
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    # ---------- veri ----------
+    def _get(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return item[0]
+
+    def run(self, command):
+        name, args = command[0].upper().decode(), command[1:]
+        with self.lock:
+            if name in ("PING",):
+                return "+PONG"
+            if name in ("AUTH", "SELECT"):
+                return "+OK"
+            if name == "GET":
+                return self._get(args[0])
+            if name == "MGET":
+                return [self._get(k) for k in args]
+            if name == "SET":
+                return self._set(args)
+            if name == "DEL":
+                return sum(self.data.pop(k, None) is not None for k in args)
+            if name == "SCAN":
+                return self._scan(args)
+            if name == "EVAL":
+                # Sadece RedisLock.RELEASE_SCRIPT: token eşleşirse sil
+                key, token = args[2], args[3]
+                if self._get(key) == token:
+                    del self.data[key]
+                    return 1
+                return 0
+        return RedisError(f"ERR unknown command '{name}'")
+
+    def _set(self, args):
+        key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+        if b"NX" in options and self._get(key) is not None:
+            return None
+        expires = None
+        if b"PX" in options:
+            expires = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+        self.data[key] = (value, expires)
+        return "+OK"
+
+    def _scan(self, args):
+        cursor = int(args[0])
+        options = {args[i].upper(): args[i + 1] for i in range(1, len(args) - 1, 2)}
+        pattern = options.get(b"MATCH", b"*").decode()
+        count = int(options.get(b"COUNT", 10))
+
+        keys = sorted(k for k in self.data if self._get(k) is not None)
+        page = keys[cursor:cursor + count]
+        following = cursor + count if cursor + count < len(keys) else 0
+        matched = [k for k in page if fnmatch.fnmatchcase(k.decode(), pattern)]
+        return [str(following).encode(), matched]
+
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        # MULTI/EXEC cevapları ayrı yazılır: Nagle gecikmesi testleri yavaşlatmasın
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        queued = None
+        while True:
+            command = self._read_command()
+            if command is None:
+                return
+            name = command[0].upper()
+            if name == b"MULTI":
+                queued = []
+                reply = "+OK"
+            elif name == b"EXEC":
+                reply = [self.server.run(c) for c in queued or []]
+                queued = None
+            elif queued is not None:
+                queued.append(command)
+                reply = "+QUEUED"
+            else:
+                reply = self.server.run(command)
+            self.wfile.write(self._encode(reply))
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        assert line[:1] == b"*", line
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def _encode(self, reply):
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, RedisError):
+            return b"-" + str(reply).encode() + b"\r\n"
+        if isinstance(reply, str):
+            return reply.encode() + b"\r\n"
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return b"*%d\r\n" % len(reply) + b"".join(self._encode(r) for r in reply)
+
+
+# =====================
+# TESTLER
+# =====================
+class RespEncodingTest(unittest.TestCase):
+    def test_encode_command(self):
+        encoded = RedisClient._encode(("SET", "anahtar", b"a\r\nb", 1500))
+        self.assertEqual(
+            encoded,
+            b"*4\r\n$3\r\nSET\r\n$7\r\nanahtar\r\n$4\r\na\r\nb\r\n$4\r\n1500\r\n"
+        )
+
+    def test_encode_utf8_length_in_bytes(self):
+        self.assertEqual(RedisClient._encode(("GET", "ş")), b"*2\r\n$3\r\nGET\r\n$2\r\n\xc5\x9f\r\n")
+
+    def test_read_replies(self):
+        client = RedisClient("redis://localhost:1/0")
+        reader = io.BytesIO(
+            b"+OK\r\n:42\r\n$-1\r\n$5\r\na\r\nbc\r\n*2\r\n$1\r\nx\r\n:1\r\n*-1\r\n-ERR hata\r\n"
+        )
+        self.assertEqual(client._read(reader), b"OK")
+        self.assertEqual(client._read(reader), 42)
+        self.assertIsNone(client._read(reader))
+        self.assertEqual(client._read(reader), b"a\r\nbc")
+        self.assertEqual(client._read(reader), [b"x", 1])
+        self.assertIsNone(client._read(reader))
+        error = client._read(reader)
+        self.assertIsInstance(error, RedisError)
+        self.assertEqual(str(error), "ERR hata")
+
+    def test_rejects_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            RedisClient("http://localhost:6379/0")
+        self.assertTrue(RedisClient("rediss://localhost:6380/0").tls)
+
+
+class RedisBackendTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandInRedis().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        # Her test kendi önekinde: aynı sunucuda birbirini görmez
+        self.prefix = f"test-{uuid.uuid4().hex[:8]}:"
+        self.backend = RedisBackend(self.server.url, self.prefix, lock_ttl=5)
+
+    def tearDown(self):
+        self.backend.close()
+
+    def test_get_set_stamp(self):
+        self.assertIsNone(self.backend.get("matches_2026-01-01.json"))
+        self.assertIsNone(self.backend.stat("matches_2026-01-01.json"))
+
+        value = b"\x00\x01binary\r\nsnapshot"
+        self.backend.set("matches_2026-01-01.json", value)
+        self.assertEqual(self.backend.get("matches_2026-01-01.json"), value)
+
+        raw, stamp, mtime = self.backend.get_with_stamp("matches_2026-01-01.json")
+        self.assertEqual(raw, value)
+        self.assertEqual(self.backend.stat("matches_2026-01-01.json"), (stamp, mtime))
+        self.assertAlmostEqual(mtime, time.time(), delta=5)
+
+        self.backend.set("matches_2026-01-01.json", value)
+        self.assertNotEqual(self.backend.stat("matches_2026-01-01.json")[0], stamp)
+
+        self.backend.delete("matches_2026-01-01.json")
+        self.assertIsNone(self.backend.get_with_stamp("matches_2026-01-01.json"))
+        self.assertIsNone(self.backend.stat("matches_2026-01-01.json"))
+
+    def test_keys_scans_all_pages(self):
+        expected = {f"matches_2026-01-{i % 28 + 1:02d}_{i}.json" for i in range(1200)}
+        for key in expected:
+            self.backend.set(key, b"{}")
+        self.backend.set("teams_2026-01-01.bin", b"")
+        lock = self.backend.lock("build")
+        self.assertTrue(lock.acquire(blocking=False))
+        try:
+            # SCAN sayfa başına 500 anahtar döner: birden fazla tur gerekir
+            self.assertEqual(set(self.backend.keys("matches_*.json")), expected)
+            self.assertEqual(set(self.backend.keys()), expected | {"teams_2026-01-01.bin"})
+        finally:
+            lock.release()
+
+    def test_lock_contention(self):
+        other = RedisBackend(self.server.url, self.prefix, lock_ttl=5)  # başka instance
+        try:
+            first, second = self.backend.lock("build"), other.lock("build")
+            self.assertTrue(first.acquire(blocking=False))
+            self.assertFalse(second.acquire(blocking=False))
+
+            started = time.monotonic()
+            self.assertFalse(second.acquire(timeout=0.3))
+            self.assertGreaterEqual(time.monotonic() - started, 0.3)
+
+            first.release()
+            self.assertTrue(second.acquire(blocking=False))
+            self.assertFalse(first.acquire(blocking=False))
+            second.release()
+        finally:
+            other.close()
+
+    def test_expired_lock_is_not_released_by_old_owner(self):
+        old_owner = RedisLock(self.backend.client, self.prefix + "lock:build", ttl=0.1)
+        new_owner = RedisLock(self.backend.client, self.prefix + "lock:build", ttl=5)
+
+        self.assertTrue(old_owner.acquire(blocking=False))
+        time.sleep(0.2)
+        self.assertTrue(new_owner.acquire(blocking=False))
+
+        old_owner.release()
+        self.assertIsNotNone(self.backend.client.execute("GET", self.prefix + "lock:build"))
+        new_owner.release()
+        self.assertIsNone(self.backend.client.execute("GET", self.prefix + "lock:build"))
+
+    def test_close_drops_pooled_connections(self):
+        self.backend.set("a.json", b"1")
+        self.assertTrue(self.backend.client._idle)
+        self.backend.close()
+        self.assertFalse(self.backend.client._idle)
+        self.assertEqual(self.backend.get("a.json"), b"1")  # gerekirse yeniden bağlanır
+
+
+class CacheManagerOutageTest(unittest.TestCase):
+    def test_reads_survive_backend_outage(self):
+        server = StandInRedis().start()
+        backend = RedisBackend(server.url, "outage:")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        manager = CacheManager(tmp.name, backend=backend)
+
+        manager.save_matches_cache({"Premier League": []}, [], for_date="2099-01-01")
+        snapshot = manager.get_matches_cache("2099-01-01")
+        self.assertEqual(snapshot["date"], "2099-01-01")
+
+        # Açık havuz bağlantıları da kapansın: yeni bağlantılar reddedilir
+        server.stop()
+        backend.close()
+
+        # Sunucu yokken: son okunan görünüm, bilinmeyen gün için None
+        self.assertIs(manager.get_matches_cache("2099-01-01"), snapshot)
+        self.assertIsNone(manager.get_matches_cache("2099-01-02"))
+        self.assertIsNone(manager.matches_cache_age("2099-01-01"))
+        self.assertEqual(manager.get_teams_cache(), {})
+        self.assertGreater(manager.backend_errors, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+coupon_optimizer testleri: _best_in_range, bench_coupons'taki kaba kuvvet
+referansıyla karşılaştırılır.
+
+Çalıştırma:
+    python -m unittest test_coupon_optimizer
+"""
+import math
+import random
+import unittest
+
+from bench_coupons import brute_force_tier
+from coupon_optimizer import (
+    ODDS_RESOLUTION, _best_in_range, _best_unconstrained, _candidate, coupon_summary,
+    optimize_coupons,
+)
+
+
+def _groups(legs):
+    """optimize_coupons'taki gibi maç başına aday grupları"""
+    by_match = {}
+    for leg in legs:
+        by_match.setdefault(leg["match"], []).append(_candidate(leg))
+    return list(by_match.values())
+
+
+def _leg(match, market, prob, odds=None):
+    leg = {"match": match, "market": market, "value": prob, "prob": prob}
+    if odds is not None:
+        leg["odds"] = odds
+    return leg
+
+
+def _score(groups, legs):
+    scores = {id(leg): score for group in groups for score, _, leg in group}
+    return sum(scores[id(leg)] for leg in legs)
+
+
+# Elle kurulmuş gruplar: oranlar aralık sınırlarından uzak
+HAND_BUILT = [
+    _leg("A - B", "MS1", 80, 1.40), _leg("A - B", "O25", 70, 1.70), _leg("A - B", "KG", 66, 1.55),
+    _leg("C - D", "MS2", 75, 1.30), _leg("C - D", "FH15", 68, 2.10),
+    _leg("E - F", "O25", 90, 1.15),
+    _leg("G - H", "KG", 72, 1.60), _leg("G - H", "MS1", 67, 1.85),
+    _leg("I - J", "MS1", 85),  # oransız: adil oran
+]
+
+
+class BestInRangeTest(unittest.TestCase):
+    def assert_matches_brute_force(self, groups, legs, min_odds, max_odds):
+        chosen = _best_in_range(groups, legs, min_odds, max_odds)
+        expected = brute_force_tier(groups, legs, min_odds, max_odds)
+        self.assertIsNotNone(expected)
+        self.assertIsNotNone(chosen)
+        self.assertEqual(len(chosen), legs)
+        self.assertAlmostEqual(_score(groups, chosen), expected[0], places=9)
+        return chosen
+
+    def test_one_leg_per_match(self):
+        groups = _groups(HAND_BUILT)
+        for legs, (lo, hi) in ((2, (1.0, 3.0)), (3, (2.0, 5.0)), (4, (2.5, 9.0))):
+            with self.subTest(legs=legs):
+                chosen = self.assert_matches_brute_force(groups, legs, lo, hi)
+                self.assertEqual(len({leg["match"] for leg in chosen}), legs)
+
+    def test_odds_range_is_respected(self):
+        groups = _groups(HAND_BUILT)
+        # Aralıksız en iyi kombinasyon (oran ~3.9) bu aralığın dışında kalır
+        chosen = self.assert_matches_brute_force(groups, 2, 1.5, 2.5)
+        odds = coupon_summary(chosen)["odds"]
+        self.assertTrue(1.5 <= odds <= 2.5, odds)
+
+        unconstrained = _best_unconstrained(groups, 2)
+        self.assertGreater(_score(groups, unconstrained), _score(groups, chosen))
+
+    def test_random_groups_never_beat_brute_force(self):
+        # Sınıra çok yakın kombinasyonlar DP'de elenebilir: DP hiçbir zaman
+        # referanstan iyi olamaz ve güvenli aralıktaki en iyiden kötü olamaz
+        rng = random.Random(5)
+        for trial in range(30):
+            legs = [
+                _leg(f"M{m}", market, rng.randint(60, 92), round(rng.uniform(1.1, 2.6), 2))
+                for m in range(rng.randint(4, 6))
+                for market in rng.sample(["MS1", "O25", "KG"], rng.randint(1, 3))
+            ]
+            groups, n_legs = _groups(legs), rng.randint(2, 3)
+            lo, hi = 1.5, rng.choice([3.0, 4.0, 6.0])
+
+            chosen = _best_in_range(groups, n_legs, lo, hi)
+            expected = brute_force_tier(groups, n_legs, lo, hi)
+            margin = math.exp(-2 * n_legs * ODDS_RESOLUTION)
+            safe = brute_force_tier(groups, n_legs, lo * math.exp(n_legs * ODDS_RESOLUTION), hi * margin)
+            with self.subTest(trial=trial):
+                if chosen is None:
+                    self.assertIsNone(safe)
+                    continue
+                self.assertTrue(lo <= coupon_summary(chosen)["odds"] <= hi)
+                self.assertLessEqual(_score(groups, chosen), expected[0] + 1e-9)
+                if safe is not None:
+                    self.assertGreaterEqual(_score(groups, chosen), safe[0] - 1e-9)
+
+    def test_no_combination_in_range(self):
+        groups = _groups(HAND_BUILT)
+        self.assertIsNone(brute_force_tier(groups, 2, 20.0, 30.0))
+        self.assertIsNone(_best_in_range(groups, 2, 20.0, 30.0))
+
+
+class OptimizeCouponsTest(unittest.TestCase):
+    def test_fallback_when_nothing_fits(self):
+        tiers = {"daily": {"legs": 2, "min_odds": 20.0, "max_odds": 30.0}}
+        coupons = optimize_coupons(HAND_BUILT, tiers=tiers)
+        expected = _best_unconstrained(_groups(HAND_BUILT), 2)
+        self.assertEqual(
+            sorted((leg["match"], leg["market"]) for leg in coupons["daily"]),
+            sorted((leg["match"], leg["market"]) for leg in expected),
+        )
+
+    def test_tiers_do_not_share_matches(self):
+        coupons = optimize_coupons(HAND_BUILT, tiers={
+            "daily": {"legs": 2, "min_odds": 1.0, "max_odds": 2.5},
+            "high_odds": {"legs": 2, "min_odds": 2.0, "max_odds": 5.0},
+        })
+        matches = [leg["match"] for legs in coupons.values() for leg in legs]
+        self.assertEqual(len(matches), 4)
+        self.assertEqual(len(set(matches)), 4)
+
+    def test_prob_drives_ev_not_value(self):
+        # Aynı skor (value), farklı model olasılığı: EV yüksek olan seçilir
+        legs = [
+            {"match": "A - B", "market": "MS1", "value": 90, "prob": 60, "odds": 1.5},
+            {"match": "A - B", "market": "O25", "value": 90, "prob": 80, "odds": 1.5},
+            _leg("C - D", "KG", 80, 1.5),
+        ]
+        coupons = optimize_coupons(legs, tiers={"daily": {"legs": 2, "min_odds": 1.0, "max_odds": 3.0}})
+        self.assertIn(("A - B", "O25"), {(leg["match"], leg["market"]) for leg in coupons["daily"]})
+        self.assertAlmostEqual(coupon_summary(coupons["daily"])["probability"], 0.64)
+
+
+if __name__ == "__main__":
+    unittest.main()
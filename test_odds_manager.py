@@ -0,0 +1,48 @@
+"""
+OddsIndex eşleştirme testleri.
+
+Çalıştırma:
+    python -m unittest test_odds_manager
+"""
+import unittest
+
+from odds_manager import OddsIndex, _parse_kickoff
+
+
+def _record(kickoff, home="Leeds United FC", away="Norwich City"):
+    return {"home": home, "away": away, "kickoff": kickoff, "odds": {"1": 1.8, "O2.5": 1.95}}
+
+
+class KickoffTest(unittest.TestCase):
+    def test_naive_and_utc_kickoffs_are_equal(self):
+        self.assertEqual(_parse_kickoff("2026-01-21T19:45:00"), _parse_kickoff("2026-01-21T19:45:00Z"))
+        self.assertIsNotNone(_parse_kickoff("2026-01-21T19:45:00").tzinfo)
+
+    def test_invalid_kickoff(self):
+        self.assertIsNone(_parse_kickoff("yarın akşam"))
+        self.assertIsNone(_parse_kickoff(None))
+
+
+class OddsIndexTest(unittest.TestCase):
+    API_KICKOFF = "2026-01-21T19:45:00Z"  # football-data utcDate
+
+    def _lookup(self, index, home=("Leeds United FC", "Leeds"), away=("Norwich City FC", "Norwich")):
+        return index.lookup(home, away, self.API_KICKOFF)
+
+    def test_matches_naive_and_z_suffixed_feed_kickoffs(self):
+        for kickoff in ("2026-01-21T19:45:00", "2026-01-21T19:45:00Z", "2026-01-21T20:30:00"):
+            with self.subTest(kickoff=kickoff):
+                index = OddsIndex([_record(kickoff)])
+                self.assertEqual(self._lookup(index), {"MS1": 1.8, "O25": 1.95})
+
+    def test_word_subset_match_with_naive_kickoff(self):
+        index = OddsIndex([_record("2026-01-21T19:45:00", home="Leeds", away="Norwich")])
+        self.assertEqual(self._lookup(index), {"MS1": 1.8, "O25": 1.95})
+
+    def test_kickoff_outside_tolerance(self):
+        index = OddsIndex([_record("2026-01-21T23:45:00"), _record("2026-01-21T15:00:00Z")])
+        self.assertIsNone(self._lookup(index))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Takım cache'inin binary formatı (TSTB) testleri.
+
+Çalıştırma:
+    python -m unittest test_team_stats
+"""
+import json
+import struct
+import tempfile
+import unittest
+
+from cache_backend import MemoryBackend
+from cache_manager import CacheManager
+from team_stats import HEADER, MAGIC, VERSION, TeamStats, dumps_teams, loads_teams
+
+
+def _stats(seed):
+    return TeamStats(
+        avg_scored=1.5 + seed, avg_conceded=0.8, over25=60.0, kg=55.5, fh15=33.3,
+        home_rate=50.0, home_avg_scored=2.1, home_avg_conceded=0.7,
+        away_avg_scored=0.9, away_avg_conceded=1.2,
+        goals_mean=1.5 + seed, goals_std=1.118, goals_n=10,
+    )
+
+
+TEAMS = {57: _stats(0), 65: _stats(1), 1044: _stats(2)}
+
+
+class TeamsFormatTest(unittest.TestCase):
+    def test_round_trip_without_expiry(self):
+        data = dumps_teams(TEAMS)
+        self.assertEqual(loads_teams(data), TEAMS)
+        self.assertEqual(
+            loads_teams(data, with_expiry=True),
+            {tid: (stats, None) for tid, stats in TEAMS.items()}
+        )
+
+    def test_round_trip_with_expiry(self):
+        expires = {57: 1_800_000_000.25, 65: None}  # 1044: kayıt yok → süresiz
+        loaded = loads_teams(dumps_teams(TEAMS, expires), with_expiry=True)
+        self.assertEqual(loaded, {
+            57: (TEAMS[57], 1_800_000_000.25),
+            65: (TEAMS[65], None),
+            1044: (TEAMS[1044], None),
+        })
+
+    def test_accepts_plain_dicts(self):
+        loaded = loads_teams(dumps_teams({"57": TEAMS[57].to_dict()}))
+        self.assertEqual(loaded, {57: TEAMS[57]})
+
+    def test_reads_version_1(self):
+        body = b"".join(stats.pack(tid) for tid, stats in TEAMS.items())
+        v1 = HEADER.pack(MAGIC, 1, len(TEAMS)) + body
+        self.assertEqual(loads_teams(v1), TEAMS)
+        self.assertEqual(loads_teams(v1, with_expiry=True)[57], (TEAMS[57], None))
+
+    def test_rejects_wrong_magic_or_version(self):
+        data = dumps_teams(TEAMS)
+        for header in (HEADER.pack(b"XXXX", VERSION, len(TEAMS)), HEADER.pack(MAGIC, VERSION + 1, len(TEAMS))):
+            with self.subTest(header=header):
+                with self.assertRaises(ValueError):
+                    loads_teams(header + data[HEADER.size:])
+
+    def test_rejects_truncated_data(self):
+        data = dumps_teams(TEAMS, {57: 1.0})
+        for cut in (data[:HEADER.size - 1], data[:-1], data + b"\0"):
+            with self.subTest(size=len(cut)):
+                with self.assertRaises((ValueError, struct.error)):
+                    loads_teams(cut)
+
+
+class TeamsCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.backend = MemoryBackend()
+        self.manager = CacheManager(tmp.name, backend=self.backend)
+
+    def test_save_and_load_with_expiry(self):
+        self.manager.save_teams_cache(TEAMS, {65: 1_800_000_000.0})
+        self.assertEqual(self.manager.get_teams_cache(), TEAMS)
+        self.assertEqual(self.manager.get_teams_cache(with_expiry=True)[65], (TEAMS[65], 1_800_000_000.0))
+
+    def test_legacy_json_fallback(self):
+        legacy = {"57": {**TEAMS[57].to_dict(), "goals_n": 10}, "65": {
+            "avg_scored": 2.0, "avg_conceded": 1.0, "goals_list": [1, 2, 3],
+        }}
+        self.backend.set(self.manager._legacy_teams_key(), json.dumps(legacy).encode())
+
+        teams = self.manager.get_teams_cache()
+        self.assertEqual(teams[57], TEAMS[57])
+        self.assertEqual((teams[65].goals_n, teams[65].goals_mean, teams[65].goals_std), (3, 2, 1.0))
+        self.assertEqual(self.manager.get_teams_cache(with_expiry=True)[57], (TEAMS[57], None))
+
+    def test_corrupt_binary_falls_back_to_legacy_json(self):
+        self.backend.set(self.manager._teams_key(), b"XXXX" + dumps_teams(TEAMS)[4:])
+        self.backend.set(self.manager._legacy_teams_key(), json.dumps({"57": TEAMS[57].to_dict()}).encode())
+        self.assertEqual(self.manager.get_teams_cache(), {57: TEAMS[57]})
+
+    def test_missing_cache_is_empty(self):
+        self.assertEqual(self.manager.get_teams_cache(), {})
+        self.assertEqual(self.manager.get_teams_cache(with_expiry=True), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Boyut sınırlı, LRU tahliyeli ve kayıt bazlı süresi dolan bellek cache'i.
+
+    - maxsize dolunca en uzun süredir kullanılmayan kayıt atılır
+    - Her kaydın kendi bitiş zamanı vardır (epoch sn); varsayılan ttl ile
+      yazılır, expire_at() ile sonradan öne çekilebilir/uzatılabilir
+    - Hit / miss / tahliye / süre dolumu istatistikleri tutulur
+    """
+
+    def __init__(self, maxsize=2000, ttl=24 * 60 * 60, name="cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+
+        self._data = OrderedDict()  # key → (value, expires_at)
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _alive(self, key, now):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= now:
+            del self._data[key]
+            self.expirations += 1
+            return None
+        return item
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._alive(key, time.time())
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value, expires_at=None):
+        with self._lock:
+            if expires_at is None and self.ttl:
+                expires_at = time.time() + self.ttl
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def expire_at(self, key, expires_at):
+        """Kaydın bitiş zamanını değiştir (örn. takımın bir sonraki maçı)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._data[key] = (item[0], expires_at)
+
+    def expires_at(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            return item[1] if item else None
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._alive(key, time.time()) is not None
+
+    def __getitem__(self, key):
+        with self._lock:
+            item = self._alive(key, time.time())
+            if item is None:
+                raise KeyError(key)
+            self._data.move_to_end(key)
+            return item[0]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def update(self, items):
+        for key, value in dict(items).items():
+            self.set(key, value)
+
+    def items(self):
+        """Süresi dolmamış kayıtların kopyası"""
+        with self._lock:
+            now = time.time()
+            return [
+                (key, value) for key, (value, expires_at) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def entries(self):
+        """Süresi dolmamış kayıtlar: [(key, value, expires_at)]"""
+        with self._lock:
+            now = time.time()
+            return [
+                (key, value, expires_at) for key, (value, expires_at) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+            }